@@ -1,19 +1,36 @@
+import functools
 import os
-from dash import dcc, html, Dash
-from dash.dependencies import Input, Output
-import plotly.express as px
+import time
+from dash import dcc, html, Dash, Patch, no_update
+from dash.dependencies import Input, Output, State, ClientsideFunction
+from flask import Response, request, g, has_request_context
+import plotly.graph_objects as go
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 import pytz
 import logging
-import dash_bootstrap_components as dbc
+import threading
+from file_watcher import start_watcher
+import price_store
+import shared_cache
+from symbol_cache import SymbolCache, SymbolData
+from time_window import RANGE_DURATIONS, window_start
+from downsampling import downsample_indices, point_budget
+from render_cache import LRUCache
+from indicators import PERIODS as INDICATOR_PERIODS
+from rollups import pick_resolution
+from market_calendar import NYSE
+from live_updates import Broadcaster, event_stream
+from metrics import BYTES_BUCKETS, Metrics, RequestProfiler
+import data_export
 
 # Configuration logging
 logging.basicConfig(filename='dashboard.log', level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # Initialize the Dash app
 app = Dash(__name__, external_stylesheets=['https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css'])
-app.title = "Tableau de Bord de Web Scrapping - Finviz (ANET)"
+app.title = "Tableau de Bord de Web Scrapping - Finviz"
+server = app.server  # WSGI entry point: gunicorn -c gunicorn.conf.py app:server
 
 # Custom CSS to fix dropdown visibility and improve styling
 app.index_string = '''
@@ -66,66 +83,279 @@ app.index_string = '''
 </html>
 '''
 
-# Chemins
+# Rendu du graphique : 'auto' passe en WebGL (Scattergl) pour les grandes séries, 'webgl' ou 'svg' pour forcer
+RENDER_MODE = os.environ.get('CHART_RENDER_MODE', 'auto')
+
+# Chemins (anciens CSV, migrés automatiquement vers price_store au premier chargement)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 HISTORICAL_FILE = os.path.join(BASE_DIR, 'historical_prices.csv')
 RECENT_FILE = os.path.join(BASE_DIR, 'recent_prices.csv')
 
-# Cache
-cached_data = None
-last_cache_time = None
-CACHE_DURATION = 290
+# Courbes superposées au prix, par type d'indicateur (la SMA est toujours affichée)
+OVERLAY_OUTPUTS = {'sma': ('SMA',), 'ema': ('EMA',), 'bollinger': ('BB_UPPER', 'BB_LOWER')}
+RSI_PERIOD = 14
 
-def load_data():
-    global cached_data, last_cache_time
-    now = datetime.now()
-    if cached_data is not None and last_cache_time is not None:
-        if (now - last_cache_time).total_seconds() < CACHE_DURATION:
-            logging.info("Utilisation du cache")
-            return cached_data
+# Au-delà, un onglet abonné reçoit une demande de reconstruction plutôt que la liste des ticks
+MAX_STREAM_TICKS = 500
 
-    try:
-        historical = pd.read_csv(HISTORICAL_FILE)
-        historical['Date'] = pd.to_datetime(historical['Date'], utc=True)
-        historical = historical.rename(columns={'Date': 'Time', 'Price': 'Price'})
-        historical['Price'] = pd.to_numeric(historical['Price'], errors='coerce')
-        logging.info(f"Données historiques chargées : {historical.head()}")
-    except Exception as e:
-        logging.error(f"Erreur chargement historique : {e}")
-        historical = pd.DataFrame(columns=['Time', 'Price'])
+# Onglets connectés au flux /stream/<symbole>, notifiés dès qu'une nouvelle version d'un symbole est chargée
+broadcaster = Broadcaster()
 
-    try:
-        recent = pd.read_csv(RECENT_FILE, names=['Time', 'Price'])
-        recent['Time'] = pd.to_datetime(recent['Time'], utc=True)
-        recent['Price'] = pd.to_numeric(recent['Price'], errors='coerce')
-        logging.info(f"Données récentes chargées : {recent.head()}")
-    except Exception as e:
-        logging.error(f"Erreur chargement récent : {e}")
-        recent = pd.DataFrame(columns=['Time', 'Price'])
-
-    combined = pd.concat([historical, recent], ignore_index=True).sort_values('Time')
-    if not combined.empty:
-        combined['Time'] = combined['Time'].dt.tz_convert('Europe/Paris')
-        combined = combined[combined['Price'].notna() & (combined['Price'] > 0)]
-        logging.info(f"Données combinées : {combined.head()}")
+# Flux ouverts au plus par processus : chaque flux occupe un thread du worker tant que l'onglet est ouvert.
+# Au-delà, le flux est refusé (503) et l'onglet revient à l'interrogation périodique (dcc.Interval),
+# pour que les callbacks gardent toujours des threads libres
+MAX_STREAMS = int(os.environ.get('MAX_STREAMS', '16'))
+
+def publish_ticks(data, previous_rows, previous_generation):
+    # Seules les lignes ajoutées depuis la version précédente sont envoyées, avec la valeur de chaque
+    # courbe déjà calculée par le moteur d'indicateurs (trace nommée SMA_20, BB_UPPER_20, ...)
+    if not broadcaster.has_subscribers(data.symbol):
+        return
+    df, version = data.state
+    new_count = len(df) - previous_rows
+    message = {'symbol': data.symbol, 'version': version, 'reset': False, 'ticks': []}
+    if previous_generation != data.generation or new_count > MAX_STREAM_TICKS:
+        message['reset'] = True
+    elif new_count > 0:
+        start = len(df) - new_count
+        overlays = {}
+        for kind, period in data.indicators.active():
+            if kind in OVERLAY_OUTPUTS:
+                values = data.indicators.values(df, kind, period)
+                overlays.update({f"{output}_{period}": values[output][start:] for output in OVERLAY_OUTPUTS[kind]})
+        for i, (tick_time, price) in enumerate(zip(df['Time'].iloc[start:], df['Price'].iloc[start:])):
+            message['ticks'].append({
+                'time': tick_time.isoformat(),
+                'price': float(price),
+                'overlays': {name: float(values[i]) for name, values in overlays.items()},
+            })
+    broadcaster.publish(data.symbol, message)
+
+# Données par symbole, chargées à la demande et invalidées dès que la signature (inode, taille, mtime)
+# d'une de leurs séries change ; seuls les MAX_SYMBOLS symboles les plus récemment consultés restent en mémoire
+symbol_cache = SymbolCache(maxsize=int(os.environ.get('MAX_SYMBOLS', '8')), on_update=publish_ticks)
+WATCH_FILES = os.environ.get('WATCH_FILES', '1') == '1'
+watcher = None
+watcher_lock = threading.Lock()
+
+# Figures et composants déjà calculés, indexés par symbole, version des données et entrées du callback
+render_cache = LRUCache(maxsize=int(os.environ.get('RENDER_CACHE_SIZE', '128')))
+
+# Mesures du processus exposées par la route /metrics (format texte Prometheus)
+metrics = Metrics()
+metrics.describe('dashboard_stage_seconds', 'histogram', "Durée des étapes du rendu (load, filter, indicator, figure-build, serialize)")
+metrics.describe('dashboard_callback_seconds', 'histogram', "Durée des callbacks serveur")
+metrics.describe('dashboard_payload_bytes', 'histogram', "Taille des réponses des callbacks serveur")
+metrics.describe('dashboard_cache_hits_total', 'counter', "Accès servis par un cache (render : figures et cartes, symbols : données par ticker)")
+metrics.describe('dashboard_cache_misses_total', 'counter', "Accès non servis par un cache")
+metrics.describe('dashboard_stream_subscribers', 'gauge', "Onglets abonnés au flux en direct")
+metrics.describe('dashboard_stream_rejected_total', 'counter', "Flux refusés (MAX_STREAMS atteint), onglets revenus à l'interrogation périodique")
+
+# Avec PROFILE_DIR, chaque requête de callback est profilée (cProfile) et son profil écrit dans ce dossier
+profiler = RequestProfiler(os.environ['PROFILE_DIR']) if os.environ.get('PROFILE_DIR') else None
+
+store_ready = False
+
+def ensure_store():
+    # Migration unique des anciens CSV vers le stockage binaire, faite par un seul worker
+    global store_ready
+    if store_ready:
+        return
+    with shared_cache.refresh_lock():
+        for kind, path, historical in ((price_store.HISTORICAL, HISTORICAL_FILE, True), (price_store.RECENT, RECENT_FILE, False)):
+            name = price_store.series_name(price_store.DEFAULT_SYMBOL, kind)
+            if not price_store.exists(name) and os.path.exists(path):
+                try:
+                    rows = price_store.migrate_csv(name, path, historical)
+                    logging.info(f"Migration de {path} vers le stockage binaire : {rows} lignes")
+                except Exception as e:
+                    logging.error(f"Erreur migration {path} : {e}")
+    store_ready = True
+
+def on_file_change(path):
+    symbol = os.path.relpath(path, price_store.STORE_DIR).split(os.sep)[0]
+    data = symbol_cache.peek(symbol)
+    if data is None:
+        return
+    data.dirty = True
+    logging.info(f"Modification détectée : {path}")
+    # Rechargement immédiat pour que la prochaine requête trouve le cache à jour
+    data.load(watched=True)
+
+def ensure_watcher(data):
+    global watcher, WATCH_FILES
+    if not WATCH_FILES:
+        return False
+    with watcher_lock:
+        for path in data.paths():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        if watcher is None:
+            # Démarré paresseusement pour que chaque processus (worker) ait son propre thread
+            watcher = start_watcher(data.paths(), on_file_change)
+            if watcher is None:
+                WATCH_FILES = False
+                return False
+        else:
+            watcher.watch(data.paths())
+    return True
+
+def available_symbols():
+    # Symboles présents dans le stockage (ANET tant qu'il est vide)
+    ensure_store()
+    return price_store.symbols() or [price_store.DEFAULT_SYMBOL]
+
+def symbol_data(symbol=None):
+    ensure_store()
+    symbol = str(symbol or price_store.DEFAULT_SYMBOL).upper()
+    # Le symbole vient du client : un symbole absent du stockage n'est ni chargé ni créé sur le disque
+    if symbol_cache.peek(symbol) is None and symbol not in available_symbols():
+        return SymbolData.unavailable(symbol)
+    data = symbol_cache.get(symbol)
+    with metrics.span('load'):
+        data.load(watched=ensure_watcher(data))
+    return data
+
+def load_data(symbol=None):
+    return symbol_data(symbol).frame
+
+def load_versioned(symbol=None):
+    # Renvoie le DataFrame et sa version, lus ensemble pour servir de clé de cache
+    return symbol_data(symbol).state
+
+def warm_up(symbols):
+    # Chargement sans watcher ni thread : appelé par le maître gunicorn (gunicorn.conf.py, preload_app) avant le fork
+    # des workers, qui héritent des données déjà en mémoire (depuis l'instantané du ticker s'il existe, voir warm_snapshot.py)
+    ensure_store()
+    for symbol in symbols:
+        try:
+            if symbol.upper() in available_symbols():
+                symbol_cache.get(symbol).load()
+        except Exception as e:
+            logging.error(f"Erreur de préchargement {symbol} : {e}")
+
+def after_fork():
+    # Worker forké depuis le maître : le thread du watcher n'existe que dans le processus qui l'a démarré,
+    # et les symboles préchargés sont revérifiés à leur prochaine lecture (écritures faites depuis le préchargement)
+    global watcher
+    watcher = None
+    symbol_cache.mark_dirty()
+
+# Tickers préchargés au démarrage : WARM_SYMBOLS=ANET,AAPL
+WARM_SYMBOLS = [symbol for symbol in os.environ.get('WARM_SYMBOLS', '').split(',') if symbol]
+
+@server.route('/stream/<symbol>')
+def stream(symbol):
+    # Flux Server-Sent Events : chaque onglet reçoit les nouveaux ticks du symbole affiché dès leur écriture
+    symbol = symbol.upper()
+    if symbol not in available_symbols():
+        return Response(status=404)
+    if len(broadcaster) >= MAX_STREAMS:
+        metrics.inc('dashboard_stream_rejected_total')
+        return Response(status=503)
+    data = symbol_data(symbol)
+    # Avec inotify le rechargement est déclenché par l'écriture ; sinon, vérification de la signature toutes les 5 s
+    response = Response(
+        event_stream(broadcaster, data.symbol, poll=lambda: symbol_data(symbol), timeout=15 if WATCH_FILES else 5),
+        mimetype='text/event-stream',
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+EXPORT_MIMETYPES = {'csv': 'text/csv', 'parquet': 'application/vnd.apache.parquet'}
+
+@server.route('/export/<symbol>')
+def export(symbol):
+    # Export de la plage sélectionnée, envoyé par morceaux : mémoire constante et premier octet immédiat
+    # /export/ANET?range=1year&format=csv|parquet&gzip=1
+    symbol = symbol.upper()
+    if symbol not in available_symbols():
+        return Response(status=404)
+    time_range = request.args.get('range', 'all')
+    if time_range.isdigit():
+        time_range = int(time_range)
+    elif time_range not in RANGE_DURATIONS and time_range not in ('all', 'ytd'):
+        return Response(f"Plage inconnue : {time_range}", status=400)
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_MIMETYPES or (export_format == 'parquet' and not data_export.parquet_available()):
+        return Response(f"Format indisponible : {export_format}", status=400)
+
+    data = symbol_data(symbol)
+    # Tranche positionnelle sur la série mappée : aucune copie avant l'écriture des morceaux
+    df_filtered = data.time_windows.slice(data.frame, time_range)
+    if export_format == 'parquet':
+        chunks = data_export.parquet_chunks(df_filtered)
     else:
-        logging.warning("Aucune donnée valide après combinaison")
+        chunks = data_export.csv_chunks(df_filtered)
+    filename = f"{data.symbol.lower()}_prices.{export_format}"
+    mimetype = EXPORT_MIMETYPES[export_format]
+    if request.args.get('gzip') == '1':
+        chunks = data_export.gzip_chunks(chunks)
+        filename += '.gz'
+        mimetype = 'application/gzip'
+    response = Response(chunks, mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+@server.route('/metrics')
+def export_metrics():
+    # Les compteurs des caches sont tenus par les caches eux-mêmes et recopiés à chaque lecture
+    for cache, source in (('render', render_cache), ('symbols', symbol_cache)):
+        metrics.set('dashboard_cache_hits_total', source.hits, cache=cache)
+        metrics.set('dashboard_cache_misses_total', source.misses, cache=cache)
+    metrics.set('dashboard_stream_subscribers', len(broadcaster))
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+def is_dash_callback():
+    return request.path.endswith('/_dash-update-component')
 
-    cached_data = combined
-    last_cache_time = now
-    return combined
+@server.before_request
+def start_request_metrics():
+    if is_dash_callback():
+        g.request_start = time.perf_counter()
+        g.profile = profiler.start() if profiler is not None else None
+
+@server.after_request
+def record_request_metrics(response):
+    start = g.get('request_start')
+    if start is None:
+        return response
+    callback = g.get('callback')
+    if callback is not None:
+        # Tout ce qui entoure le callback : lecture de la requête et sérialisation JSON des sorties par Dash
+        metrics.observe('dashboard_stage_seconds', time.perf_counter() - start - g.callback_seconds, stage='serialize')
+        metrics.observe('dashboard_payload_bytes', response.calculate_content_length() or 0, BYTES_BUCKETS, callback=callback)
+    profile = g.get('profile')
+    if profile is not None:
+        path = profiler.stop(profile, callback or 'callback')
+        logging.info(f"Profil de la requête {callback} : {path}")
+    return response
+
+def instrumented(name):
+    # Times a server callback; the name also labels the payload size measured once Dash has serialized the outputs
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                metrics.observe('dashboard_callback_seconds', elapsed, callback=name)
+                if has_request_context():
+                    g.callback, g.callback_seconds = name, elapsed
+        return wrapper
+    return decorator
 
 def is_market_closed(date):
-    return date.weekday() >= 5
+    # Week-end, jour férié ou fermeture exceptionnelle du NYSE
+    return not NYSE.is_session(date)
 
 def get_last_market_day(date):
-    current_date = date
-    while is_market_closed(current_date):
-        current_date -= timedelta(days=1)
-    return current_date
+    return NYSE.previous_session(date)
 
-def daily_report(df, selected_date=None):
-    if df.empty:
+def daily_report(aggregates, selected_date=None):
+    if aggregates.table.empty:
         return [html.P("Aucune donnée disponible pour le rapport quotidien.")], 0.0
     
     if selected_date is None:
@@ -135,25 +365,27 @@ def daily_report(df, selected_date=None):
 
     if is_market_closed(selected_date):
         last_market_date = get_last_market_day(selected_date)
-        df_date = df[df['Time'].dt.date == last_market_date]
-        if df_date.empty:
+        if last_market_date is None:
+            return [html.P(f"Aucune séance avant le {selected_date.strftime('%Y-%m-%d')}.")], 0.0
+        day = aggregates.day(last_market_date)
+        if day is None:
             return [html.P(f"Aucune donnée pour le dernier jour de marché ({last_market_date.strftime('%Y-%m-%d')}).")], 0.0
         report = [
-            html.P(f"Marché fermé le {selected_date.strftime('%Y-%m-%d')} (week-end)."),
+            html.P(f"Marché fermé le {selected_date.strftime('%Y-%m-%d')} (week-end ou jour férié)."),
             html.P(f"Dernier rapport disponible ({last_market_date.strftime('%Y-%m-%d')}) :")
         ]
     else:
-        df_date = df[df['Time'].dt.date == selected_date]
+        day = aggregates.day(selected_date)
         report = [html.P(f"Rapport Quotidien ({selected_date.strftime('%Y-%m-%d')}) :")]
 
-    if df_date.empty:
+    if day is None:
         return [html.P(f"Aucune donnée pour le {selected_date.strftime('%Y-%m-%d')}.")], 0.0
 
-    open_price = df_date.iloc[0]['Price']
-    close_price = df_date.iloc[-1]['Price']
-    volatility = (df_date['Price'].max() - df_date['Price'].min()) / df_date['Price'].mean() * 100
+    open_price = day['open']
+    close_price = day['close']
+    avg_price = day['sum'] / day['count']
+    volatility = (day['max'] - day['min']) / avg_price * 100
     performance = (close_price - open_price) / open_price * 100
-    avg_price = df_date['Price'].mean()
 
     report.append(html.Ul([
         html.Li(f"Prix d'ouverture : ${open_price:.2f}"),
@@ -165,13 +397,15 @@ def daily_report(df, selected_date=None):
 
     return report, performance
 
-def period_report(df_filtered):
-    if df_filtered.empty:
+def period_report(aggregates, start_date, end_date):
+    # Combine les lignes journalières de la période au lieu de parcourir les ticks
+    period = aggregates.period(pd.to_datetime(start_date).date(), pd.to_datetime(end_date).date())
+    if period is None:
         return [html.P("Aucune donnée pour la période sélectionnée.")], 0.0
     
-    open_price = df_filtered.iloc[0]['Price']
-    close_price = df_filtered.iloc[-1]['Price']
-    volatility = (df_filtered['Price'].max() - df_filtered['Price'].min()) / df_filtered['Price'].mean() * 100
+    open_price = period['open']
+    close_price = period['close']
+    volatility = (period['max'] - period['min']) / (period['sum'] / period['count']) * 100
     performance = (close_price - open_price) / open_price * 100
 
     report = html.Ul([
@@ -183,7 +417,7 @@ def period_report(df_filtered):
 
     return [report], performance
 
-def get_latest_price_and_change(df):
+def get_latest_price_and_change(df, symbol=price_store.DEFAULT_SYMBOL):
     if df.empty:
         return "Prix en temps réel indisponible.", 0.0
     latest_price = df.iloc[-1]['Price']
@@ -191,7 +425,7 @@ def get_latest_price_and_change(df):
     price_change = 0.0
     if previous_price != 0:  # Avoid division by zero
         price_change = (latest_price - previous_price) / previous_price * 100
-    return f"Prix actuel de ANET : ${latest_price:.2f} (à {df.iloc[-1]['Time'].strftime('%Y-%m-%d %H:%M:%S')})", price_change
+    return f"Prix actuel de {symbol} : ${latest_price:.2f} (à {df.iloc[-1]['Time'].strftime('%Y-%m-%d %H:%M:%S')})", price_change
 
 def get_price_stats(df):
     if df.empty:
@@ -216,6 +450,7 @@ block_content = [
         html.H2("Prix en Temps Réel", className="text-lg font-semibold text-gray-200 mb-2"),
         html.H3(id='realtime-price', className="text-xl font-bold text-green-400"),
         html.P(id='price-change', className="text-sm mt-2"),
+        html.P(id='rsi-value', className="text-sm text-gray-400 mt-1"),
     ], className="bg-gray-700 p-4 rounded-lg shadow-md flex-1 mx-2 min-w-[200px]"),
 
     # Global Statistics Card
@@ -249,8 +484,15 @@ block_content = [
 app.layout = html.Div([
 # Header
 html.Div([
-    html.H1("Tableau de Bord de Web Scrapping - Finviz (ANET | Arista Networks)", className="text-3xl font-bold text-gray-200 text-center mb-4"),
-    html.P("Suivi en temps réel des prix de ANET via Finviz", className="text-lg text-gray-400 text-center mb-2"),
+    html.H1("Tableau de Bord de Web Scrapping - Finviz", className="text-3xl font-bold text-gray-200 text-center mb-4"),
+    html.P(id='ticker-subtitle', className="text-lg text-gray-400 text-center mb-2"),
+    dcc.Dropdown(
+        id='ticker-dropdown',
+        options=[{'label': price_store.DEFAULT_SYMBOL, 'value': price_store.DEFAULT_SYMBOL}],
+        value=price_store.DEFAULT_SYMBOL,
+        clearable=False,
+        className="mx-auto mb-4 p-2 rounded bg-gray-600 text-gray-200 w-64"
+    ),
     html.P("Réalisé par Vithusan KAILASAPILLAI et Rudy LOGGHE", className="text-md text-gray-300 text-center mb-6")
 ], className="bg-gray-800 p-6 rounded-lg shadow-lg mb-6"),
     # Main Content
@@ -292,103 +534,246 @@ html.Div([
                 className="mb-4 p-2 rounded bg-gray-600 text-gray-200"
             ),
 
-            # SMA Period Filter
-            html.Label("Période de la Moyenne Mobile :", className="text-gray-200 mb-2"),
+            # Indicator Period Filter (SMA, and the optional overlays below)
+            html.Label("Période des Indicateurs :", className="text-gray-200 mb-2"),
             dcc.Dropdown(
                 id='sma-period-dropdown',
-                options=[
-                    {'label': 'SMA 10', 'value': 10},
-                    {'label': 'SMA 20', 'value': 20},
-                    {'label': 'SMA 50', 'value': 50},
-                ],
+                options=[{'label': f'SMA {period}', 'value': period} for period in INDICATOR_PERIODS],
                 value=50,
                 className="mb-4 p-2 rounded bg-gray-600 text-gray-200"
             ),
+            dcc.Checklist(
+                id='indicator-checklist',
+                options=[
+                    {'label': ' EMA', 'value': 'ema'},
+                    {'label': ' Bandes de Bollinger', 'value': 'bollinger'},
+                ],
+                value=[],
+                inline=True,
+                inputClassName="mr-1",
+                labelClassName="mr-4",
+                className="mb-4 text-gray-200"
+            ),
+
+            # Chart Type (candlesticks read the OHLC rollups)
+            dcc.RadioItems(
+                id='chart-type',
+                options=[
+                    {'label': ' Ligne', 'value': 'line'},
+                    {'label': ' Chandeliers', 'value': 'candles'},
+                ],
+                value='line',
+                inline=True,
+                inputClassName="mr-1",
+                labelClassName="mr-4",
+                className="mb-4 text-gray-200"
+            ),
 
             # Price Graph
             dcc.Graph(id='price-graph', config={'displayModeBar': True}, className="bg-gray-700 p-4 rounded-lg shadow-md"),
 
-            # Download Button
-            html.Button(
+            # Download links, streamed by the /export route
+            html.A(
                 "Télécharger les Données (CSV)",
                 id='download-button',
+                download='',
                 className="inline-block mt-4 px-4 py-2 bg-blue-600 text-white rounded hover:bg-blue-700"
             ),
-            dcc.Download(id="download-dataframe-csv"),
+            html.A(
+                "Parquet",
+                id='download-parquet',
+                download='',
+                style=None if data_export.parquet_available() else {'display': 'none'},
+                className="inline-block mt-4 ml-2 px-4 py-2 bg-gray-600 text-gray-200 rounded hover:bg-gray-500"
+            ),
         ], className="w-full p-4"),
     ], className="flex flex-col gap-6"),
     
-    # Update Interval
-    dcc.Interval(id='interval-component', interval=5*60*1000, n_intervals=0)
+    # Fallback polling, disabled while the live stream is connected
+    dcc.Interval(id='interval-component', interval=5*60*1000, n_intervals=0),
+
+    # Last message received from /stream/<symbol>
+    dcc.Store(id='live-tick'),
+
+    # Browser width, used to size the point budget of the graph
+    dcc.Store(id='graph-width'),
+
+    # Version of the data last delivered to this tab, and what the graph currently shows (for partial updates)
+    dcc.Store(id='data-version'),
+    dcc.Store(id='graph-state')
 ], className="bg-gray-800 min-h-screen p-6")
 
+app.clientside_callback(
+    "function(_) { return window.innerWidth; }",
+    Output('graph-width', 'data'),
+    Input('time-range-dropdown', 'value')
+)
+
+# One EventSource per tab, reopened when the ticker changes (assets/live_updates.js)
+app.clientside_callback(
+    ClientsideFunction(namespace='live', function_name='connect'),
+    Output('interval-component', 'disabled'),
+    Input('ticker-dropdown', 'value')
+)
+
+# New ticks are appended to the figure in the browser; only the cards go back to the server
+app.clientside_callback(
+    ClientsideFunction(namespace='live', function_name='apply_tick'),
+    [Output('price-graph', 'figure', allow_duplicate=True),
+     Output('graph-state', 'data', allow_duplicate=True),
+     Output('data-version', 'data', allow_duplicate=True)],
+    Input('live-tick', 'data'),
+    [State('price-graph', 'figure'),
+     State('graph-state', 'data')],
+    prevent_initial_call=True
+)
+
 @app.callback(
-    [Output('price-graph', 'figure'),
-     Output('realtime-price', 'children'),
-     Output('price-change', 'children'),
-     Output('price-stats-min', 'children'),
-     Output('price-stats-max', 'children'),
-     Output('price-stats-avg', 'children'),
-     Output('price-stats-volatility', 'children'),
-     Output('daily-report', 'children'),
-     Output('evolution-badge', 'children'),
-     Output('period-report', 'children'),
-     Output('period-evolution-badge', 'children')],
-    [Input('interval-component', 'n_intervals'),
-     Input('time-range-dropdown', 'value'),
-     Input('sma-period-dropdown', 'value'),
-     Input('report-date-picker', 'date'),
-     Input('period-date-picker', 'start_date'),
-     Input('period-date-picker', 'end_date')]
+    Output('ticker-dropdown', 'options'),
+    Input('data-version', 'data')
 )
-def update_dashboard(n, time_range, sma_period, report_date, period_start_date, period_end_date):
-    df = load_data()
-    if df.empty:
-        return ({}, "Prix indisponible", "", "N/A", "N/A", "N/A", "N/A", [html.P("Aucune donnée disponible.")], "", [html.P("Aucune donnée disponible.")], "")
-
-    # Filter data for graph
-    now = datetime.now(pytz.timezone('Europe/Paris'))
-    if time_range not in ['all', '5years', '3years', '1year', 'ytd', '6months', '3months', '1month', '1week']:
-        cutoff = now - pd.Timedelta(minutes=time_range)
-        df_filtered = df[df['Time'] >= cutoff]
-    elif time_range == '5years':
-        cutoff = now - pd.Timedelta(days=5*365)
-        df_filtered = df[df['Time'] >= cutoff]
-    elif time_range == '3years':
-        cutoff = now - pd.Timedelta(days=3*365)
-        df_filtered = df[df['Time'] >= cutoff]
-    elif time_range == '1year':
-        cutoff = now - pd.Timedelta(days=365)
-        df_filtered = df[df['Time'] >= cutoff]
-    elif time_range == 'ytd':
-        cutoff = pd.to_datetime(f"{now.year}-01-01").tz_localize('Europe/Paris')
-        df_filtered = df[df['Time'] >= cutoff]
-    elif time_range == '6months':
-        cutoff = now - pd.Timedelta(days=180)
-        df_filtered = df[df['Time'] >= cutoff]
-    elif time_range == '3months':
-        cutoff = now - pd.Timedelta(days=90)
-        df_filtered = df[df['Time'] >= cutoff]
-    elif time_range == '1month':
-        cutoff = now - pd.Timedelta(days=30)
-        df_filtered = df[df['Time'] >= cutoff]
-    elif time_range == '1week':
-        cutoff = now - pd.Timedelta(days=7)
-        df_filtered = df[df['Time'] >= cutoff]
+@instrumented('ticker_options')
+def update_ticker_options(data_version):
+    # Symboles présents dans le stockage ; seules les données du symbole sélectionné sont chargées
+    symbols = available_symbols()
+    return [{'label': symbol, 'value': symbol} for symbol in symbols]
+
+@app.callback(
+    Output('ticker-subtitle', 'children'),
+    Input('ticker-dropdown', 'value')
+)
+@instrumented('ticker_subtitle')
+def update_ticker_subtitle(symbol):
+    return f"Suivi en temps réel des prix de {symbol} via Finviz"
+
+def zoom_bounds(relayout_data, df_window):
+    # Positions (début, fin) de la zone zoomée dans df_window, ou None sans zoom
+    if not relayout_data:
+        return None
+    if 'xaxis.range[0]' in relayout_data and 'xaxis.range[1]' in relayout_data:
+        bounds = relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]']
+    elif isinstance(relayout_data.get('xaxis.range'), list):
+        bounds = relayout_data['xaxis.range'][:2]
     else:
-        df_filtered = df
-    
-    df_filtered = df_filtered.sort_values('Time')
+        return None
+    try:
+        # Plotly renvoie l'heure affichée (heure de Paris) sans fuseau
+        start, end = (pd.Timestamp(b).tz_localize('Europe/Paris', ambiguous=True, nonexistent='shift_forward') for b in bounds)
+    except (ValueError, TypeError):
+        return None
+    times = df_window['Time']
+    return int(times.searchsorted(start, side='left')), int(times.searchsorted(end, side='right'))
+
+def use_webgl(points):
+    if RENDER_MODE == 'webgl':
+        return True
+    if RENDER_MODE == 'svg':
+        return False
+    return points > 1000
+
+def time_values(times):
+    # ISO 8601 strings, the same representation plotly uses when serializing the full figure
+    return [t.isoformat() for t in times]
+
+# Overlay line styles, by indicator output
+OVERLAY_STYLES = {
+    'SMA': dict(width=1.5, dash='dash', color='#F97316'),  # Thinner, dashed line for SMA
+    'EMA': dict(width=1.5, dash='dot', color='#A855F7'),
+    'BB_UPPER': dict(width=1, color='#9CA3AF'),
+    'BB_LOWER': dict(width=1, color='#9CA3AF'),
+}
 
-    # Calculate SMA for graph
-    sma_label = f"SMA_{sma_period}"
-    df_filtered[sma_label] = df_filtered['Price'].rolling(window=sma_period, min_periods=1).mean()
+@metrics.span('filter')
+def filter_window(data, df, time_range, now):
+    return data.time_windows.slice(df, time_range, now)
+
+@metrics.span('indicator')
+def latest_rsi(data, df):
+    # Dernière valeur du RSI, tenue à jour tick par tick par le moteur d'indicateurs
+    return data.indicators.values(df, 'rsi', RSI_PERIOD)['RSI'][-1]
+
+@metrics.span('indicator')
+def overlay_lines(data, df, df_filtered, sma_period, overlays):
+    # (trace name, values aligned with df_filtered) for the SMA and each selected overlay, read from the indicator engine
+    start = len(df) - len(df_filtered)
+    lines = []
+    for kind in ['sma'] + [kind for kind in OVERLAY_OUTPUTS if kind in (overlays or [])]:
+        values = data.indicators.values(df, kind, sma_period)
+        lines.extend((f"{output}_{sma_period}", values[output][start:]) for output in OVERLAY_OUTPUTS[kind])
+    return lines
+
+@metrics.span('figure-build')
+def plot_indices(df_filtered, zoom, budget):
+    # Downsample to the point budget of the graph width (LTTB), with full detail in the zoomed area
+    return downsample_indices(
+        df_filtered['Time'].to_numpy(dtype='datetime64[ns]').view('int64'),
+        df_filtered['Price'].to_numpy(),
+        budget,
+        zoom,
+    )
+
+def latest_annotation(latest):
+    return dict(
+        x=latest['Time'].isoformat(),
+        y=float(latest['Price']),
+        text=f"${latest['Price']:.2f}",
+        showarrow=True,
+        arrowhead=2,
+        ax=20,
+        ay=-30,
+        font=dict(color='#E5E7EB')
+    )
+
+@metrics.span('figure-build')
+def candle_bars(data, df, df_filtered, resolution):
+    # OHLC bars of the window from the symbol's rollups, and the position of each bar's last tick in df_filtered
+    start = len(df) - len(df_filtered)
+    bars = data.rollups.bars(df, resolution, start)
+    return bars, bars['last_index'] - start
+
+def plot_view(data, df, df_filtered, version, time_range, cutoff, zoom, budget, resolution):
+    # (bars, positions of the plotted points in df_filtered): LTTB on the raw ticks, or the last tick of each candle
+    if resolution is not None:
+        return render_cache.get_or_compute(
+            ('bars', version, time_range, cutoff, resolution), lambda: candle_bars(data, df, df_filtered, resolution))
+    return None, render_cache.get_or_compute(
+        ('indices', version, time_range, cutoff, zoom, budget), lambda: plot_indices(df_filtered, zoom, budget))
+
+def snapshot_figure(data, df, df_filtered, time_range, sma_period, overlays, resolution, zoom, budget):
+    # Default view prebuilt by warm_snapshot.py: only served while it plots exactly the same rows (no tick since it was written,
+    # same first row in the window), so it is identical to the figure build_figure would return
+    snapshot = data.snapshot
+    if snapshot is None or len(df) != snapshot.rows or overlays or resolution is not None or zoom is not None:
+        return None
+    return snapshot.figure(time_range, sma_period, budget, len(df) - len(df_filtered))
+
+@metrics.span('figure-build')
+def build_figure(df_filtered, lines, indices, time_range, symbol, bars=None, resolution=None):
+    hover = "Ligne=%{fullData.name}<br>Time=%{x}<br>Prix ($)=%{y}<extra></extra>"
+    if bars is not None:
+        # Candlesticks: one bar per rollup bucket, overlays sampled at the last tick of each bar
+        times = time_values(pd.to_datetime(bars['time'], utc=True).tz_convert('Europe/Paris'))
+        scatter = go.Scatter
+        price = go.Candlestick(x=times, open=bars['open'].tolist(), high=bars['high'].tolist(), low=bars['low'].tolist(),
+                               close=bars['close'].tolist(), name='Price', increasing_line_color='#34D399', decreasing_line_color='#F87171')
+    else:
+        df_plot = df_filtered.iloc[indices]
+        times = time_values(df_plot['Time'])
+        scatter = go.Scattergl if use_webgl(len(df_plot)) else go.Scatter
+        price = scatter(x=times, y=df_plot['Price'].tolist(), name='Price', mode='lines', hovertemplate=hover,
+                        line=dict(width=3, color='#2563EB'))  # Thicker line for Price
 
     # Create graph
-    fig = px.line(df_filtered, x='Time', y=['Price', sma_label],
-                  labels={'value': 'Prix ($)', 'variable': 'Ligne'},
-                  title='Évolution de ANET (Scraping toutes les 5 minutes)')
+    fig = go.Figure([price] + [
+        scatter(x=times, y=values[indices].tolist(), name=name, mode='lines', hovertemplate=hover, opacity=0.7,
+                line=OVERLAY_STYLES[name.rsplit('_', 1)[0]])  # Thinner, semi-transparent overlays
+        for name, values in lines
+    ])
     fig.update_layout(
+        title=f'Évolution de {symbol} (Scraping toutes les 5 minutes)' + (f' - bougies {resolution}' if bars is not None else ''),
+        xaxis_title='Time',
+        yaxis_title='Prix ($)',
+        uirevision=f"{symbol}-{time_range}",  # Keep the user's zoom across refreshes of the same symbol and range
         plot_bgcolor='#374151',  # bg-gray-700
         paper_bgcolor='#374151',  # bg-gray-700
         font_color='#E5E7EB',  # text-gray-200
@@ -411,100 +796,244 @@ def update_dashboard(n, time_range, sma_period, report_date, period_start_date,
             type='date'
         )
     )
-    fig.update_traces(line_width=3, line_color='#2563EB', selector=dict(name='Price'))  # Thicker line for Price
-    fig.update_traces(line_width=1.5, line_dash='dash', line_color='#F97316', opacity=0.7, selector=dict(name=sma_label))  # Thinner, dashed, semi-transparent line for SMA
 
     if not df_filtered.empty:
-        latest = df_filtered.iloc[-1]
-        fig.add_annotation(
-            x=latest['Time'],
-            y=latest['Price'],
-            text=f"${latest['Price']:.2f}",
-            showarrow=True,
-            arrowhead=2,
-            ax=20,
-            ay=-30,
-            font=dict(color='#E5E7EB')
-        )
+        fig.add_annotation(**latest_annotation(df_filtered.iloc[-1]))
+
+    return fig.to_dict()
+
+def same_cutoff(previous, current, time_range):
+    # Minute ranges slide with the clock; longer ranges only need a rebuild when the cutoff changes day
+    if isinstance(time_range, str) and previous is not None and current is not None:
+        return previous[:10] == current[:10]
+    return previous == current
+
+@metrics.span('figure-build')
+def patch_overlays(lines, indices):
+    # Only the overlay traces change: the downsampled price points stay where they are
+    patched = Patch()
+    for trace, (name, values) in enumerate(lines, start=1):
+        patched['data'][trace]['y'] = values[indices].tolist()
+        patched['data'][trace]['name'] = name
+    return patched
+
+@metrics.span('figure-build')
+def patch_append(df_filtered, lines, new_count):
+    # New ticks are appended to every trace instead of resending the whole figure
+    new_rows = df_filtered.iloc[-new_count:]
+    times = time_values(new_rows['Time'])
+    patched = Patch()
+    patched['data'][0]['x'].extend(times)
+    patched['data'][0]['y'].extend(new_rows['Price'].tolist())
+    for trace, (_, values) in enumerate(lines, start=1):
+        patched['data'][trace]['x'].extend(times)
+        patched['data'][trace]['y'].extend(values[-new_count:].tolist())
+    patched['layout']['annotations'][0] = latest_annotation(df_filtered.iloc[-1])
+    return patched
 
-    # Real-time price and change
-    realtime, change = get_latest_price_and_change(df)
+def build_realtime(df, symbol, rsi):
+    realtime, change = get_latest_price_and_change(df, symbol)
     change_text = f"Changement: {'+' if change >= 0 else ''}{change:.2f}%"
     change_color = "text-green-400" if change >= 0 else "text-red-400"
-    change_text = html.Span(change_text, className=change_color)
+    return realtime, html.Span(change_text, className=change_color), f"RSI {RSI_PERIOD} : {rsi:.1f}"
 
-    # Global statistics
+def build_stats(df_filtered):
     stats = get_price_stats(df_filtered)
-    min_text = f"Prix Minimum: ${stats['min']:.2f}"
-    max_text = f"Prix Maximum: ${stats['max']:.2f}"
-    avg_text = f"Prix Moyen: ${stats['avg']:.2f}"
-    volatility_text = f"Volatilité: {stats['volatility']:.2f}%"
-
-    # Daily report
-    daily_rep, daily_perf = daily_report(df, report_date)
-    daily_badge = f"Performance: {'+' if daily_perf >= 0 else ''}{daily_perf:.2f}%"
-    daily_badge_color = "text-green-400" if daily_perf >= 0 else "text-red-400"
-    daily_badge = html.Span(daily_badge, className=daily_badge_color)
-
-    # Period report
-    period_start_date = pd.to_datetime(period_start_date).date()
-    period_end_date = pd.to_datetime(period_end_date).date()
-    df_period = df[(df['Time'].dt.date >= period_start_date) & (df['Time'].dt.date <= period_end_date)]
-    period_rep, period_perf = period_report(df_period)
-    period_badge = f"Performance: {'+' if period_perf >= 0 else ''}{period_perf:.2f}%"
-    period_badge_color = "text-green-400" if period_perf >= 0 else "text-red-400"
-    period_badge = html.Span(period_badge, className=period_badge_color)
-
-    return (fig, realtime, change_text, min_text, max_text, avg_text, volatility_text, daily_rep, daily_badge, period_rep, period_badge)
-
-# Callback for handling the download
+    return (f"Prix Minimum: ${stats['min']:.2f}",
+            f"Prix Maximum: ${stats['max']:.2f}",
+            f"Prix Moyen: ${stats['avg']:.2f}",
+            f"Volatilité: {stats['volatility']:.2f}%")
+
+def performance_badge(performance):
+    badge = f"Performance: {'+' if performance >= 0 else ''}{performance:.2f}%"
+    badge_color = "text-green-400" if performance >= 0 else "text-red-400"
+    return html.Span(badge, className=badge_color)
+
+def build_daily(aggregates, report_date):
+    daily_rep, daily_perf = daily_report(aggregates, report_date)
+    return daily_rep, performance_badge(daily_perf)
+
+def build_period(aggregates, period_start_date, period_end_date):
+    period_rep, period_perf = period_report(aggregates, period_start_date, period_end_date)
+    return period_rep, performance_badge(period_perf)
+
+# Each card has its own callback and only reruns when its own inputs change.
+# The data version is published by the live stream, or by the interval when the stream is down;
+# cards listen to it and skip ticks without new data.
 @app.callback(
-    Output("download-dataframe-csv", "data"),
-    [Input("download-button", "n_clicks"),
-     Input('time-range-dropdown', 'value')],
-    prevent_initial_call=True
+    Output('data-version', 'data'),
+    [Input('interval-component', 'n_intervals'),
+     Input('ticker-dropdown', 'value')],
+    State('data-version', 'data')
 )
-def download_csv(n_clicks, time_range):
-    if not n_clicks:
-        return None
+@instrumented('data_version')
+def update_data_version(n, symbol, current_version):
+    _, version = load_versioned(symbol)
+    return no_update if version == current_version else version
 
-    df = load_data()
-    
-    # Filter data based on selected time range
-    now = datetime.now(pytz.timezone('Europe/Paris'))
-    if time_range not in ['all', '5years', '3years', '1year', 'ytd', '6months', '3months', '1month', '1week']:
-        cutoff = now - pd.Timedelta(minutes=time_range)
-        df_filtered = df[df['Time'] >= cutoff]
-    elif time_range == '5years':
-        cutoff = now - pd.Timedelta(days=5*365)
-        df_filtered = df[df['Time'] >= cutoff]
-    elif time_range == '3years':
-        cutoff = now - pd.Timedelta(days=3*365)
-        df_filtered = df[df['Time'] >= cutoff]
-    elif time_range == '1year':
-        cutoff = now - pd.Timedelta(days=365)
-        df_filtered = df[df['Time'] >= cutoff]
-    elif time_range == 'ytd':
-        cutoff = pd.to_datetime(f"{now.year}-01-01").tz_localize('Europe/Paris')
-        df_filtered = df[df['Time'] >= cutoff]
-    elif time_range == '6months':
-        cutoff = now - pd.Timedelta(days=180)
-        df_filtered = df[df['Time'] >= cutoff]
-    elif time_range == '3months':
-        cutoff = now - pd.Timedelta(days=90)
-        df_filtered = df[df['Time'] >= cutoff]
-    elif time_range == '1month':
-        cutoff = now - pd.Timedelta(days=30)
-        df_filtered = df[df['Time'] >= cutoff]
-    elif time_range == '1week':
-        cutoff = now - pd.Timedelta(days=7)
-        df_filtered = df[df['Time'] >= cutoff]
-    else:
-        df_filtered = df
+@app.callback(
+    [Output('price-graph', 'figure'),
+     Output('graph-state', 'data')],
+    [Input('data-version', 'data'),
+     Input('ticker-dropdown', 'value'),
+     Input('time-range-dropdown', 'value'),
+     Input('sma-period-dropdown', 'value'),
+     Input('price-graph', 'relayoutData'),
+     Input('graph-width', 'data'),
+     Input('indicator-checklist', 'value'),
+     Input('chart-type', 'value')],
+    State('graph-state', 'data')
+)
+@instrumented('graph')
+def update_graph(data_version, symbol, time_range, sma_period, relayout_data=None, graph_width=None, overlays=None,
+                 chart_type='line', graph_state=None):
+    data = symbol_data(symbol)
+    df, version = data.state
+    if df.empty:
+        return {}, None
 
-    if not df_filtered.empty:
-        return dcc.send_data_frame(df_filtered.to_csv, "anet_prices.csv", index=False)
-    return None
+    # Filter data for graph (same "now" for the slice and the cache keys)
+    now = pd.Timestamp.now(tz='Europe/Paris')
+    cutoff = window_start(time_range, now)
+    df_filtered = filter_window(data, df, time_range, now)
+    zoom = zoom_bounds(relayout_data, df_filtered)
+    budget = point_budget(graph_width)
+    overlays = sorted(overlays or [])
+    resolution = None
+    if chart_type == 'candles' and not df_filtered.empty:
+        # Coarsest rollup that still gives about one candle every two pixels; minute ranges keep the raw ticks
+        span = now - cutoff if cutoff is not None else df_filtered['Time'].iloc[-1] - df_filtered['Time'].iloc[0]
+        resolution = pick_resolution(span, budget // 4)
+    state = {
+        'symbol': data.symbol,
+        'version': version,
+        'time_range': time_range,
+        'cutoff': None if cutoff is None else cutoff.isoformat(),
+        'sma_period': sma_period,
+        'overlays': overlays,
+        'chart': chart_type,
+        'resolution': resolution,
+        'zoom': None if zoom is None else list(zoom),
+        'budget': budget,
+        'last_time': df_filtered['Time'].iloc[-1].isoformat() if not df_filtered.empty else None,
+        'appended': 0,
+    }
+    previous = graph_state or {}
+    same_view = (all(previous.get(key) == state[key] for key in ('symbol', 'time_range', 'overlays', 'chart', 'resolution', 'zoom', 'budget'))
+                 and same_cutoff(previous.get('cutoff'), state['cutoff'], time_range))
+
+    if same_view and previous.get('version') == version:
+        if previous.get('sma_period') == sma_period:
+            return no_update, no_update
+        if not previous.get('appended') and previous.get('cutoff') == state['cutoff']:
+            _, indices = plot_view(data, df, df_filtered, version, time_range, cutoff, zoom, budget, resolution)
+            return patch_overlays(overlay_lines(data, df, df_filtered, sma_period, overlays), indices), state
+
+    # Long ranges: new ticks since the last render are appended in place (minute ranges slide, so they are rebuilt;
+    # candles are rebuilt from the rollups, whose last bar changes in place)
+    elif (same_view and isinstance(time_range, str) and resolution is None and previous.get('sma_period') == sma_period
+            and previous.get('last_time') is not None and state['last_time'] is not None):
+        new_count = len(df_filtered) - int(df_filtered['Time'].searchsorted(pd.Timestamp(previous['last_time']), side='right'))
+        appended = previous.get('appended', 0) + new_count
+        if 0 < new_count and appended <= budget:
+            # The figure keeps the left edge it was built with until the cutoff moves to another day
+            state.update(cutoff=previous['cutoff'], appended=appended)
+            return patch_append(df_filtered, overlay_lines(data, df, df_filtered, sma_period, overlays), new_count), state
+
+    # Figures are memoized on the data version plus the inputs they depend on
+    def compute():
+        fig = snapshot_figure(data, df, df_filtered, time_range, sma_period, overlays, resolution, zoom, budget)
+        if fig is not None:
+            return fig
+        bars, indices = plot_view(data, df, df_filtered, version, time_range, cutoff, zoom, budget, resolution)
+        return build_figure(df_filtered, overlay_lines(data, df, df_filtered, sma_period, overlays), indices, time_range,
+                            data.symbol, bars, resolution)
+    fig = render_cache.get_or_compute(
+        ('figure', version, time_range, cutoff, sma_period, tuple(overlays), resolution, zoom, budget), compute)
+    return fig, state
+
+@app.callback(
+    [Output('realtime-price', 'children'),
+     Output('price-change', 'children'),
+     Output('rsi-value', 'children')],
+    [Input('data-version', 'data'),
+     Input('ticker-dropdown', 'value')]
+)
+@instrumented('realtime')
+def update_realtime(data_version, symbol):
+    data = symbol_data(symbol)
+    df, version = data.state
+    if df.empty:
+        return "Prix indisponible", "", ""
+    return render_cache.get_or_compute(('realtime', version), lambda: build_realtime(df, data.symbol, latest_rsi(data, df)))
+
+@app.callback(
+    [Output('price-stats-min', 'children'),
+     Output('price-stats-max', 'children'),
+     Output('price-stats-avg', 'children'),
+     Output('price-stats-volatility', 'children')],
+    [Input('data-version', 'data'),
+     Input('ticker-dropdown', 'value'),
+     Input('time-range-dropdown', 'value')]
+)
+@instrumented('stats')
+def update_stats(data_version, symbol, time_range):
+    data = symbol_data(symbol)
+    df, version = data.state
+    if df.empty:
+        return "N/A", "N/A", "N/A", "N/A"
+    now = pd.Timestamp.now(tz='Europe/Paris')
+    cutoff = window_start(time_range, now)
+    return render_cache.get_or_compute(
+        ('stats', version, time_range, cutoff), lambda: build_stats(filter_window(data, df, time_range, now)))
+
+@app.callback(
+    [Output('daily-report', 'children'),
+     Output('evolution-badge', 'children')],
+    [Input('data-version', 'data'),
+     Input('ticker-dropdown', 'value'),
+     Input('report-date-picker', 'date')]
+)
+@instrumented('daily_report')
+def update_daily_report(data_version, symbol, report_date):
+    data = symbol_data(symbol)
+    df, version = data.state
+    if df.empty:
+        return [html.P("Aucune donnée disponible.")], ""
+    today = pd.Timestamp.now(tz='Europe/Paris').date().isoformat()
+    return render_cache.get_or_compute(('daily', version, report_date or today), lambda: build_daily(data.daily_aggregates, report_date))
+
+@app.callback(
+    [Output('period-report', 'children'),
+     Output('period-evolution-badge', 'children')],
+    [Input('data-version', 'data'),
+     Input('ticker-dropdown', 'value'),
+     Input('period-date-picker', 'start_date'),
+     Input('period-date-picker', 'end_date')]
+)
+@instrumented('period_report')
+def update_period_report(data_version, symbol, period_start_date, period_end_date):
+    data = symbol_data(symbol)
+    df, version = data.state
+    if df.empty:
+        return [html.P("Aucune donnée disponible.")], ""
+    return render_cache.get_or_compute(
+        ('period', version, period_start_date, period_end_date), lambda: build_period(data.daily_aggregates, period_start_date, period_end_date))
+
+# Download links follow the selected ticker and range (no server round trip)
+app.clientside_callback(
+    """
+    function(symbol, timeRange) {
+        var url = 'export/' + encodeURIComponent(symbol) + '?range=' + encodeURIComponent(timeRange);
+        return [url + '&format=csv', url + '&format=parquet'];
+    }
+    """,
+    [Output('download-button', 'href'),
+     Output('download-parquet', 'href')],
+    [Input('ticker-dropdown', 'value'),
+     Input('time-range-dropdown', 'value')]
+)
 
 if __name__ == '__main__':
+    warm_up(WARM_SYMBOLS)
     app.run(host='0.0.0.0', port=8050, debug=True)
\ No newline at end of file
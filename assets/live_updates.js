@@ -0,0 +1,108 @@
+// Flux des nouveaux ticks (Server-Sent Events) : remplace l'interrogation périodique du serveur.
+(function () {
+    var source = null;
+    var retry = null;
+
+    // Flux refusé (serveur saturé, voir MAX_STREAMS) : nouvel essai après ce délai, l'intervalle prend le relais d'ici là
+    var RETRY_MS = 60000;
+
+    function streamUrl(symbol) {
+        var config = document.getElementById('_dash-config');
+        var prefix = config ? JSON.parse(config.textContent).requests_pathname_prefix : '/';
+        return prefix + 'stream/' + encodeURIComponent(symbol);
+    }
+
+    function rebuild(tick) {
+        // Le serveur reconstruit la figure : seule la version des données est publiée
+        var noUpdate = window.dash_clientside.no_update;
+        return [noUpdate, noUpdate, tick.version];
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        live: {
+            connect: function (symbol) {
+                if (source !== null) {
+                    source.close();
+                    source = null;
+                }
+                if (retry !== null) {
+                    clearTimeout(retry);
+                    retry = null;
+                }
+                if (!symbol || typeof EventSource === 'undefined') {
+                    return false;
+                }
+                source = new EventSource(streamUrl(symbol));
+                // L'intervalle ne sert que de secours quand le flux est coupé
+                source.onopen = function () {
+                    window.dash_clientside.set_props('interval-component', {disabled: true});
+                };
+                var current = source;
+                source.onerror = function () {
+                    window.dash_clientside.set_props('interval-component', {disabled: false});
+                    // Coupure réseau : EventSource se reconnecte seul ; réponse en erreur (503) : il abandonne
+                    if (current === source && current.readyState === EventSource.CLOSED) {
+                        retry = setTimeout(function () {
+                            retry = null;
+                            if (current === source) {
+                                window.dash_clientside.live.connect(symbol);
+                            }
+                        }, RETRY_MS);
+                    }
+                };
+                source.onmessage = function (event) {
+                    window.dash_clientside.set_props('live-tick', {data: JSON.parse(event.data)});
+                };
+                return false;
+            },
+
+            apply_tick: function (tick, figure, state) {
+                var noUpdate = window.dash_clientside.no_update;
+                if (!tick) {
+                    return [noUpdate, noUpdate, noUpdate];
+                }
+                // Plages en minutes (fenêtre glissante), changement de symbole ou série réécrite : reconstruction
+                if (tick.reset || !state || !figure || !figure.data || figure.data.length < 1
+                        || state.symbol !== tick.symbol || typeof state.time_range !== 'string' || !state.last_time) {
+                    return rebuild(tick);
+                }
+                // Trace 0 : le prix ; les suivantes : les indicateurs, dont chaque tick porte la valeur par nom de trace
+                var traces = figure.data;
+                if (traces.some(function (trace) { return !Array.isArray(trace.x) || !Array.isArray(trace.y); })) {
+                    return rebuild(tick);
+                }
+
+                var lastTime = Date.parse(state.last_time);
+                var ticks = tick.ticks.filter(function (t) { return Date.parse(t.time) > lastTime; });
+                var appended = (state.appended || 0) + ticks.length;
+                var missing = ticks.some(function (t) {
+                    return traces.slice(1).some(function (trace) { return t.overlays[trace.name] === undefined; });
+                });
+                if (appended > state.budget || missing) {
+                    return rebuild(tick);
+                }
+                if (ticks.length === 0) {
+                    return [noUpdate, Object.assign({}, state, {version: tick.version}), tick.version];
+                }
+
+                var times = ticks.map(function (t) { return t.time; });
+                var last = ticks[ticks.length - 1];
+                var data = traces.map(function (trace, i) {
+                    var values = ticks.map(function (t) { return i === 0 ? t.price : t.overlays[trace.name]; });
+                    return Object.assign({}, trace, {x: trace.x.concat(times), y: trace.y.concat(values)});
+                });
+                var layout = Object.assign({}, figure.layout);
+                if (layout.annotations && layout.annotations.length) {
+                    layout.annotations = [Object.assign({}, layout.annotations[0], {
+                        x: last.time,
+                        y: last.price,
+                        text: '$' + last.price.toFixed(2)
+                    })].concat(layout.annotations.slice(1));
+                }
+                // graph-state suit la figure affichée : le serveur ne renverra pas ces ticks
+                var newState = Object.assign({}, state, {version: tick.version, last_time: last.time, appended: appended});
+                return [Object.assign({}, figure, {data: data, layout: layout}), newState, tick.version];
+            }
+        }
+    });
+})();
@@ -0,0 +1,205 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Tailles par défaut : nombre total de lignes (historique quotidien + ticks récents)
+DEFAULT_SIZES = (10_000, 1_000_000, 10_000_000)
+# Les ticks récents couvrent les 5 dernières années, l'historique quotidien commence en 2000
+RECENT_YEARS = 5
+HISTORY_START = '2000-01-01'
+# Au-delà de ce facteur entre deux médianes, une mesure est signalée comme régression
+REGRESSION_FACTOR = 1.5
+
+SYMBOL = 'ANET'
+GRAPH_WIDTH = 1200
+
+def synthetic_csvs(directory, rows, seed=0):
+    """Écrit historical_prices.csv (Date,Price quotidiens) et recent_prices.csv (ticks sans en-tête) totalisant `rows` lignes."""
+    historical_path = os.path.join(directory, 'historical_prices.csv')
+    recent_path = os.path.join(directory, 'recent_prices.csv')
+    if os.path.exists(historical_path) and os.path.exists(recent_path):
+        return historical_path, recent_path
+
+    rng = np.random.default_rng(seed)
+    now = pd.Timestamp.now(tz='UTC').floor('min')
+    recent_start = now - pd.DateOffset(years=RECENT_YEARS)
+    days = pd.bdate_range(pd.Timestamp(HISTORY_START, tz='UTC'), recent_start, inclusive='left')[-(rows // 2):]
+    recent_rows = rows - len(days)
+
+    # Marche aléatoire multiplicative, prolongée de l'historique aux ticks récents ; la volatilité par pas
+    # diminue avec le nombre de lignes pour que les prix restent strictement positifs une fois arrondis
+    prices = 50 * np.exp(np.cumsum(rng.normal(0, 1 / np.sqrt(rows), rows)))
+    historical = pd.DataFrame({'Date': np.datetime_as_string(days.to_numpy(dtype='datetime64[s]'), unit='s'),
+                               'Price': prices[:len(days)].round(2)})
+    historical['Date'] += '+00:00'
+    historical.to_csv(historical_path, index=False)
+
+    times = np.linspace(recent_start.value, now.value, recent_rows).astype('int64').view('datetime64[ns]')
+    recent = pd.DataFrame({'Time': np.char.add(np.datetime_as_string(times, unit='s'), '+00:00'),
+                           'Price': prices[len(days):].round(2)})
+    recent.to_csv(recent_path, index=False, header=False)
+    return historical_path, recent_path
+
+def timed(function, repeat):
+    # Première exécution (souvent à froid) et médiane de toutes les exécutions, en millisecondes
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        durations.append((time.perf_counter() - start) * 1000)
+    return result, {'first_ms': round(durations[0], 3), 'median_ms': round(statistics.median(durations), 3),
+                    'min_ms': round(min(durations), 3)}
+
+def run(directory, repeat):
+    """Mesures dans un processus neuf, sur le stockage `directory`/store construit depuis les CSV du dossier."""
+    results = {}
+    import price_store
+
+    historical_path = os.path.join(directory, 'historical_prices.csv')
+    recent_path = os.path.join(directory, 'recent_prices.csv')
+    _, results['parse_csv'] = timed(lambda: (price_store.migrate_csv(price_store.series_name(SYMBOL, price_store.HISTORICAL), historical_path, True),
+                                             price_store.migrate_csv(price_store.series_name(SYMBOL, price_store.RECENT), recent_path, False)), 1)
+
+    start = time.perf_counter()
+    import app
+    import plotly.io
+    from time_window import TimeWindows
+    results['import_app'] = {'first_ms': round((time.perf_counter() - start) * 1000, 3)}
+
+    def serialize(value):
+        return plotly.io.json.to_json_plotly(value)
+
+    df, results['load_data'] = timed(lambda: app.load_data(SYMBOL), repeat)
+    results['rows'] = len(df)
+    data = app.symbol_data(SYMBOL)
+
+    # Rechargement après l'ajout d'un tick (chemin incrémental du cache)
+    last_ns = int(df['Time'].iloc[-1].value)
+    appended = iter(range(1, repeat + 1))
+    def append_and_load():
+        price_store.append_series(price_store.series_name(SYMBOL, price_store.RECENT), [last_ns + next(appended) * 10**9], [100.0])
+        return app.load_data(SYMBOL)
+    df, results['load_data_append'] = timed(append_and_load, repeat)
+
+    now = pd.Timestamp.now(tz='Europe/Paris')
+    time_ranges = [option['value'] for option in app.app.layout['time-range-dropdown'].options]
+    results['time_ranges'] = {}
+    for time_range in time_ranges:
+        entry = {}
+        # Découpe sans les bornes mémorisées, comme au premier affichage d'une plage
+        df_filtered, entry['slice'] = timed(lambda: TimeWindows().slice(df, time_range, now), repeat)
+        entry['rows'] = len(df_filtered)
+        _, entry['get_price_stats'] = timed(lambda: app.get_price_stats(df_filtered), repeat)
+        for chart_type in ('line', 'candles'):
+            def graph():
+                app.render_cache.clear()
+                return app.update_graph(None, SYMBOL, time_range, 20, None, GRAPH_WIDTH, ['ema', 'bollinger'], chart_type, None)
+            (figure, _), entry[f'update_graph_{chart_type}'] = timed(graph, repeat)
+            payload, entry[f'serialize_{chart_type}'] = timed(lambda: serialize(figure), repeat)
+            entry[f'figure_bytes_{chart_type}'] = len(payload)
+        results['time_ranges'][str(time_range)] = entry
+
+    aggregates = data.daily_aggregates
+    first_day = df['Time'].iloc[0].date().isoformat()
+    last_day = df['Time'].iloc[-1].date().isoformat()
+    _, results['daily_report'] = timed(lambda: app.daily_report(aggregates, last_day), repeat)
+    _, results['period_report'] = timed(lambda: app.period_report(aggregates, first_day, last_day), repeat)
+    _, results['get_price_stats_all'] = timed(lambda: app.get_price_stats(df), repeat)
+
+    # Affichage complet de la page : tous les callbacks serveur déclenchés au chargement, sans cache de rendu
+    def dashboard():
+        app.render_cache.clear()
+        outputs = [
+            app.update_data_version(0, SYMBOL, None),
+            app.update_graph(None, SYMBOL, '1year', 20, None, GRAPH_WIDTH, [], 'line', None),
+            app.update_realtime(None, SYMBOL),
+            app.update_stats(None, SYMBOL, '1year'),
+            app.update_daily_report(None, SYMBOL, last_day),
+            app.update_period_report(None, SYMBOL, first_day, last_day),
+        ]
+        return serialize(outputs)
+    payload, results['dashboard'] = timed(dashboard, repeat)
+    results['dashboard']['payload_bytes'] = len(payload)
+    return results
+
+def benchmark(sizes, repeat, workdir):
+    report = {
+        'generated': pd.Timestamp.now(tz='UTC').isoformat(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'repeat': repeat,
+        'sizes': {},
+    }
+    for rows in sizes:
+        directory = os.path.join(workdir, str(rows))
+        os.makedirs(directory, exist_ok=True)
+        start = time.perf_counter()
+        synthetic_csvs(directory, rows)
+        print(f"{rows} lignes : CSV générés en {time.perf_counter() - start:.1f} s", file=sys.stderr)
+        store = os.path.join(directory, 'store')
+        shutil.rmtree(store, ignore_errors=True)
+        # Processus séparé : stockage dédié, imports et caches à froid pour chaque taille
+        env = dict(os.environ, PRICE_STORE_DIR=store, WATCH_FILES='0')
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--run', directory, '--repeat', str(repeat)],
+                                cwd=directory, env=env, check=True, capture_output=True, text=True).stdout
+        report['sizes'][str(rows)] = json.loads(output)
+    return report
+
+def timings(results, prefix=''):
+    # Mesures à plat (chemin -> médiane en ms) pour la comparaison avec une référence
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict) and 'median_ms' in value:
+            flat[prefix + key] = value['median_ms']
+        elif isinstance(value, dict):
+            flat.update(timings(value, f"{prefix}{key}/"))
+    return flat
+
+def regressions(report, baseline, factor=REGRESSION_FACTOR):
+    current, previous = timings(report['sizes']), timings(baseline['sizes'])
+    # Les mesures de moins d'une milliseconde sont trop bruitées pour être comparées
+    return {path: {'baseline_ms': previous[path], 'median_ms': median}
+            for path, median in current.items()
+            if path in previous and median > 1 and median > factor * previous[path]}
+
+if __name__ == '__main__':
+    # python3 benchmark.py                                   (10k, 1M et 10M lignes, rapport dans benchmark.json)
+    # python3 benchmark.py --sizes 10000 1000000 --baseline benchmark.json --output nouveau.json
+    parser = argparse.ArgumentParser(description="Mesure des chemins critiques du tableau de bord sur des données synthétiques")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help="nombre total de lignes")
+    parser.add_argument('--repeat', type=int, default=5, help="exécutions par mesure")
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'dashboard-benchmark'),
+                        help="dossier des CSV synthétiques (conservés entre deux lancements)")
+    parser.add_argument('--output', default='benchmark.json', help="rapport JSON")
+    parser.add_argument('--baseline', default=None, help="rapport précédent : code de sortie 1 en cas de régression")
+    parser.add_argument('--run', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run(args.run, args.repeat)))
+        sys.exit(0)
+
+    report = benchmark(args.sizes, args.repeat, args.workdir)
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['regressions'] = regressions(report, json.load(f))
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    for rows, results in report['sizes'].items():
+        print(f"{rows} lignes : load_data {results['load_data']['first_ms']:.0f} ms à froid, "
+              f"page complète {results['dashboard']['median_ms']:.0f} ms ({results['dashboard']['payload_bytes']} octets)")
+    if report.get('regressions'):
+        for path, values in report['regressions'].items():
+            print(f"Régression : {path} {values['baseline_ms']} -> {values['median_ms']} ms", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+from market_calendar import NYSE
+
+COLUMNS = ['open', 'close', 'min', 'max', 'sum', 'sumsq', 'count']
+
+def empty_table():
+    return pd.DataFrame({column: pd.Series(dtype='int64' if column == 'count' else 'float64') for column in COLUMNS},
+                        index=pd.DatetimeIndex([], name='Date'))
+
+def aggregate(df, calendar=NYSE):
+    """Agrège des ticks triés par séance : ouverture, clôture, min, max, somme, somme des carrés, nombre.
+
+    La table est indexée par le jour de la séance ; les ticks hors séance (nuit, week-end, jours fériés) sont ignorés.
+    """
+    if df.empty:
+        return empty_table()
+    sessions = calendar.session_ids(df['Time'].to_numpy(dtype='datetime64[ns]').view('int64'))
+    in_session = sessions >= 0
+    prices = df['Price'].to_numpy(dtype='float64')[in_session]
+    sessions = sessions[in_session]
+    if not len(prices):
+        return empty_table()
+    # Ticks triés : les indices de séance sont croissants, chaque séance est une suite contiguë
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(sessions)) + 1))
+    ends = np.append(starts[1:], len(prices))
+    days = calendar.days[sessions[starts]]
+    return pd.DataFrame({
+        'open': prices[starts],
+        'close': prices[ends - 1],
+        'min': np.minimum.reduceat(prices, starts),
+        'max': np.maximum.reduceat(prices, starts),
+        'sum': np.add.reduceat(prices, starts),
+        'sumsq': np.add.reduceat(prices * prices, starts),
+        'count': ends - starts,
+    }, index=pd.DatetimeIndex(days.astype('datetime64[ns]'), name='Date'))
+
+def combine(rows):
+    # Fusionne des lignes journalières consécutives en une seule
+    return {
+        'open': rows['open'].iloc[0],
+        'close': rows['close'].iloc[-1],
+        'min': rows['min'].min(),
+        'max': rows['max'].max(),
+        'sum': rows['sum'].sum(),
+        'sumsq': rows['sumsq'].sum(),
+        'count': int(rows['count'].sum()),
+    }
+
+class DailyAggregates:
+    """Table des séances maintenue au fil des ajouts de ticks."""
+
+    def __init__(self, calendar=NYSE):
+        self.calendar = calendar
+        self.table = empty_table()
+
+    def rebuild(self, df):
+        self.table = aggregate(df, self.calendar)
+
+    def restore(self, table, new_rows):
+        # Table relue d'un instantané, complétée avec les ticks arrivés depuis
+        self.table = table
+        self.update(new_rows)
+
+    def update(self, new_rows):
+        if new_rows.empty:
+            return
+        new_table = aggregate(new_rows, self.calendar)
+        table = self.table
+        if new_table.empty:
+            return
+        if table.empty:
+            self.table = new_table
+            return
+        last_day = table.index[-1]
+        if new_table.index[0] < last_day:
+            raise ValueError("Ticks antérieurs à la dernière séance agrégée : reconstruction nécessaire")
+        if new_table.index[0] == last_day:
+            # La première séance des nouveaux ticks complète la dernière séance de la table
+            merged = combine(pd.concat([table.iloc[-1:], new_table.iloc[:1]]))
+            new_table = pd.concat([pd.DataFrame(merged, index=new_table.index[:1]), new_table.iloc[1:]])
+            table = table.iloc[:-1]
+        # Nouvelle table assignée en une fois pour que les lecteurs ne voient jamais un état partiel
+        self.table = pd.concat([table, new_table])
+
+    def day(self, date):
+        table = self.table
+        key = pd.Timestamp(date)
+        if key not in table.index:
+            return None
+        return table.loc[key].to_dict()
+
+    def period(self, start_date, end_date):
+        rows = self.table.loc[pd.Timestamp(start_date):pd.Timestamp(end_date)]
+        if rows.empty:
+            return None
+        return combine(rows)
@@ -0,0 +1,72 @@
+import importlib.util
+import zlib
+
+# Lignes par morceau : la mémoire de l'export ne dépend pas de la taille de la plage exportée.
+# Les morceaux CSV restent petits pour que le premier octet parte vite (~0,1 s de formatage chacun) ;
+# en Parquet, un morceau est un groupe de lignes, plus grand pour garder une bonne compression.
+CSV_CHUNK_ROWS = 10_000
+PARQUET_CHUNK_ROWS = 100_000
+
+def parquet_available():
+    # pyarrow n'est importé qu'au premier export Parquet (sans pyarrow, l'export Parquet est désactivé)
+    return importlib.util.find_spec('pyarrow') is not None
+
+def csv_chunks(df, chunk_rows=CSV_CHUNK_ROWS):
+    # Même format que DataFrame.to_csv(index=False), produit morceau par morceau
+    if df.empty:
+        yield df.to_csv(index=False).encode()
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=start == 0).encode()
+
+def gzip_chunks(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+class ChunkSink:
+    """Fichier en écriture seule dont le contenu est vidé après chaque groupe de lignes Parquet."""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+def parquet_chunks(df, chunk_rows=PARQUET_CHUNK_ROWS):
+    # Un groupe de lignes par morceau, envoyé dès qu'il est écrit
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = ChunkSink()
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for start in range(0, len(df), chunk_rows):
+            writer.write_table(pa.Table.from_pandas(df.iloc[start:start + chunk_rows], schema=schema, preserve_index=False))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
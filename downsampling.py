@@ -0,0 +1,57 @@
+import numpy as np
+
+# Nombre de points envoyés au navigateur par pixel de largeur du graphique
+POINTS_PER_PIXEL = 2
+DEFAULT_WIDTH = 1200
+MIN_POINTS = 500
+# Largeurs arrondies au palier supérieur : des fenêtres de tailles voisines partagent le même budget,
+# donc les mêmes figures en cache (et celles de l'instantané de démarrage, voir warm_snapshot.py)
+WIDTH_STEP = 160
+
+def point_budget(width):
+    if not width:
+        width = DEFAULT_WIDTH
+    width = -(-int(width) // WIDTH_STEP) * WIDTH_STEP
+    return max(MIN_POINTS, width * POINTS_PER_PIXEL)
+
+def lttb_indices(x, y, n_out):
+    """Indices retenus par Largest-Triangle-Three-Buckets (conserve les extrêmes visuels).
+
+    `x` et `y` sont des tableaux NumPy numériques de même longueur, `x` trié.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+
+    # n_out - 2 paquets entre le premier et le dernier point, qui sont toujours conservés
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    counts = ends - starts
+    mean_x = np.add.reduceat(x[:n - 1], starts) / counts
+    mean_y = np.add.reduceat(y[:n - 1], starts) / counts
+    # Le point de référence du dernier paquet est le dernier point de la série
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = starts[i], ends[i]
+        area = np.abs((x[a] - next_x[i]) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y[i] - y[a]))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+def downsample_indices(times_ns, prices, n_out, zoom=None):
+    """Indices à tracer : la série entière réduite à `n_out` points, plus `n_out` points
+    sur la zone zoomée `zoom` = (début, fin) en positions, pour y retrouver le détail."""
+    indices = lttb_indices(times_ns, prices, n_out)
+    if zoom is not None:
+        start, stop = zoom
+        if stop - start > 0:
+            fine = start + lttb_indices(times_ns[start:stop], prices[start:stop], n_out)
+            indices = np.union1d(indices, fine)
+    return indices
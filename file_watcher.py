@@ -0,0 +1,99 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import sys
+import threading
+
+# Constantes inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT_HEADER = struct.Struct('iIII')
+
+def load_libc():
+    if not sys.platform.startswith('linux'):
+        return None
+    libc_name = ctypes.util.find_library('c')
+    if libc_name is None:
+        return None
+    libc = ctypes.CDLL(libc_name, use_errno=True)
+    if not hasattr(libc, 'inotify_init1'):
+        return None
+    return libc
+
+class FileWatcher(threading.Thread):
+    """Thread qui appelle `on_change(path)` dès qu'un des fichiers surveillés est écrit."""
+
+    def __init__(self, libc, paths, on_change):
+        super().__init__(name='file-watcher', daemon=True)
+        self.libc = libc
+        self.on_change = on_change
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 a échoué")
+        self.lock = threading.Lock()
+        self.watched = {}
+        try:
+            self.watch(paths)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def watch(self, paths):
+        # Ajout de fichiers à surveiller ; on surveille les dossiers parents pour suivre aussi les fichiers remplacés par rename
+        with self.lock:
+            for path in paths:
+                directory, name = os.path.split(os.path.abspath(path))
+                wd = next((w for w, (d, _) in self.watched.items() if d == directory), None)
+                if wd is None:
+                    wd = self.libc.inotify_add_watch(self.fd, directory.encode(), WATCH_MASK)
+                    if wd < 0:
+                        raise OSError(ctypes.get_errno(), f"inotify_add_watch a échoué sur {directory}")
+                    self.watched[wd] = (directory, set())
+                self.watched[wd][1].add(name)
+
+    def run(self):
+        while True:
+            try:
+                buffer = os.read(self.fd, 64 * 1024)
+            except OSError as e:
+                logging.error(f"Watcher arrêté : {e}")
+                return
+            changed = set()
+            pos = 0
+            with self.lock:
+                watched = dict(self.watched)
+            while pos < len(buffer):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(buffer, pos)
+                name = buffer[pos + EVENT_HEADER.size:pos + EVENT_HEADER.size + length].rstrip(b'\0').decode()
+                pos += EVENT_HEADER.size + length
+                if mask & IN_Q_OVERFLOW:
+                    # Des événements ont été perdus : on considère tout comme modifié
+                    changed.update(os.path.join(d, n) for d, names in watched.values() for n in names)
+                elif wd in watched and name in watched[wd][1]:
+                    changed.add(os.path.join(watched[wd][0], name))
+            for path in sorted(changed):
+                try:
+                    self.on_change(path)
+                except Exception as e:
+                    logging.error(f"Erreur du watcher sur {path} : {e}")
+
+def start_watcher(paths, on_change):
+    # Renvoie None si inotify n'est pas disponible (le cache retombe alors sur os.stat)
+    libc = load_libc()
+    if libc is None:
+        logging.info("inotify indisponible, surveillance par signature de fichier uniquement")
+        return None
+    try:
+        watcher = FileWatcher(libc, paths, on_change)
+    except OSError as e:
+        logging.warning(f"Impossible de démarrer le watcher : {e}")
+        return None
+    watcher.start()
+    return watcher
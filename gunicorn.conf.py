@@ -0,0 +1,22 @@
+import os
+
+# gunicorn -c gunicorn.conf.py app:server
+# Le maître importe app.py une seule fois (Dash, pandas, plotly : l'essentiel du démarrage) et précharge les tickers
+# de WARM_SYMBOLS ; chaque worker est forké avec tout cela déjà en mémoire. Un worker relancé (plantage, max_requests)
+# ou ajouté (TTIN) répond donc sans réimporter ni recalculer.
+bind = os.environ.get('BIND', '0.0.0.0:8050')
+workers = int(os.environ.get('WORKERS', '4'))
+# Chaque onglet ouvert garde une connexion au flux en direct (/stream), d'où les threads ; la moitié au plus
+# leur est réservée (MAX_STREAMS), les autres restent aux callbacks même quand beaucoup d'onglets sont ouverts
+threads = int(os.environ.get('THREADS', '32'))
+os.environ.setdefault('MAX_STREAMS', str(threads // 2))
+preload_app = True
+
+def when_ready(server):
+    # Après l'import de l'application par le maître, avant le fork des premiers workers
+    import app
+    app.warm_up(app.WARM_SYMBOLS)
+
+def post_fork(server, worker):
+    import app
+    app.after_fork()
@@ -1,26 +1,136 @@
-import yfinance as yf
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
+import price_store
 
-def historical_data(ticker="ANET", start_date="2000-01-01", end_date="2025-04-05"):
+# Début de l'historique téléchargé pour un ticker sans données
+DEFAULT_START = "2000-01-01"
+
+# Taille des tranches téléchargées : chaque tranche est enregistrée avant de passer à la suivante,
+# un import interrompu reprend donc à la dernière date stockée
+CHUNK_DAYS = 365
+
+# Sources de données : fonction (ticker, début, fin exclue) -> DataFrame avec les colonnes Date et Price
+
+def yfinance_source(ticker, start, end):
+    # yf.Ticker(...).history plutôt que yf.download : download range ses résultats dans un dictionnaire global
+    # du module, vidé à chaque appel, et mélangerait les téléchargements parallèles de backfill_all
+    import yfinance as yf
+    data = yf.Ticker(ticker).history(start=start.strftime('%Y-%m-%d'), end=end.strftime('%Y-%m-%d'), auto_adjust=True)
+    if data.empty:
+        return pd.DataFrame(columns=['Date', 'Price'])
+    # Séances datées à minuit heure de New York : ramenées à la date seule (minuit UTC, comme le reste de l'historique)
+    if data.index.tz is not None:
+        data.index = data.index.tz_localize(None)
+    # Extraire la colonne 'Close' (prix de clôture) et la date
+    data = data[['Close']].reset_index()
+    data.columns = ['Date', 'Price']
+    return data
+
+def recorded_source(directory):
+    # Données enregistrées : <dossier>/<TICKER>.csv au format Date,Price (ancien historical_prices.csv)
+    def source(ticker, start, end):
+        data = pd.read_csv(os.path.join(directory, f"{ticker.upper()}.csv"))[['Date', 'Price']]
+        dates = pd.to_datetime(data['Date'], utc=True)
+        return data[(dates >= start) & (dates < end)]
+    return source
+
+def fake_source(ticker, start, end):
+    # Marche aléatoire reproductible sur les jours ouvrés, pour les essais hors ligne (mêmes prix quel que soit le découpage)
+    dates = pd.bdate_range(pd.Timestamp(DEFAULT_START, tz='UTC'), end, inclusive='left')
+    rng = np.random.default_rng(list(ticker.upper().encode()))
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+    keep = dates >= start
+    return pd.DataFrame({'Date': dates[keep], 'Price': prices[keep]})
+
+def to_columns(data):
+    # Horodatages en nanosecondes UTC (minuit, comme l'ancien format ISO 8601 +00:00)
+    data = data[data['Price'].notna() & (data['Price'] > 0)]
+    dates = pd.to_datetime(data['Date'])
+    dates = dates.dt.tz_localize('UTC') if dates.dt.tz is None else dates.dt.tz_convert('UTC')
+    return dates.to_numpy(dtype='datetime64[ns]').view('int64'), data['Price'].to_numpy(dtype='float64')
+
+def default_end(end_date=None):
+    # Fin exclue : par défaut aujourd'hui, pour ne stocker que des séances terminées. La « clôture » du jour
+    # pendant la séance serait le dernier prix, jamais corrigé (le rattrapage suivant reprend au lendemain).
+    return pd.Timestamp(end_date, tz='UTC') if end_date else pd.Timestamp.now(tz='UTC').normalize()
+
+def backfill(ticker, source=yfinance_source, start_date=DEFAULT_START, end_date=None, chunk_days=CHUNK_DAYS):
+    """Télécharge uniquement les jours manquants après la dernière date stockée ; renvoie le nombre de lignes ajoutées."""
+    name = price_store.historical_series(ticker)
+    start = pd.Timestamp(start_date, tz='UTC')
+    last = price_store.last_time(name)
+    if last is not None:
+        start = max(start, pd.Timestamp(last, tz='UTC').normalize() + pd.Timedelta(days=1))
+    end = default_end(end_date)
+
+    added = 0
+    while start < end:
+        chunk_end = min(start + pd.Timedelta(days=chunk_days), end)
+        data = source(ticker, start, chunk_end)
+        if not data.empty:
+            added += price_store.append_new(name, *to_columns(data))
+        start = chunk_end
+    return added
+
+def backfill_all(tickers, source=yfinance_source, workers=4, **kwargs):
+    # Plusieurs tickers en parallèle (les téléchargements attendent le réseau, les écritures sont verrouillées par série)
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {ticker: executor.submit(backfill, ticker, source, **kwargs) for ticker in tickers}
+        for ticker, future in futures.items():
+            try:
+                results[ticker] = future.result()
+                print(f"{ticker} : {results[ticker]} lignes ajoutées dans {price_store.series_dir(price_store.historical_series(ticker))}")
+            except Exception as e:
+                results[ticker] = None
+                print(f"Erreur lors de la récupération des données de {ticker} : {e}")
+    return results
+
+def historical_data(ticker=price_store.DEFAULT_SYMBOL, start_date=DEFAULT_START, end_date=None, source=yfinance_source):
+    # Téléchargement complet et réécriture de la série (à utiliser si l'historique stocké est faux)
     try:
-        # Télécharger les données historiques avec yfinance
-        data = yf.download(ticker, start=start_date, end=end_date)
+        start = pd.Timestamp(start_date, tz='UTC')
+        end = default_end(end_date)
+        data = source(ticker, start, end)
         if data.empty:
             print(f"Aucune donnée trouvée pour {ticker} entre {start_date} et {end_date}")
             return
-        
-        # Extraire la colonne 'Close' (prix de clôture) et la date
-        data = data[['Close']].reset_index()
-        data.columns = ['Date', 'Price']
-        
-        # Convertir la date au format ISO 8601
-        data['Date'] = pd.to_datetime(data['Date']).dt.strftime('%Y-%m-%dT%H:%M:%S+00:00')
-        
-        # Enregistrer dans historical_prices.csv
-        data.to_csv('/home/ubuntu/Web-Scrapping/historical_prices.csv', index=False)
-        print(f"Données historiques pour {ticker} enregistrées dans historical_prices.csv")
+
+        # Enregistrer dans le stockage binaire (export CSV disponible depuis le tableau de bord)
+        times_ns, prices = price_store.clean_columns(*to_columns(data))
+        name = price_store.historical_series(ticker)
+        price_store.write_series(name, times_ns, prices)
+        print(f"Données historiques pour {ticker} enregistrées dans {price_store.series_dir(name)}")
     except Exception as e:
         print(f"Erreur lors de la récupération des données : {e}")
 
+def make_source(spec):
+    if spec == 'yfinance':
+        return yfinance_source
+    if spec == 'fake':
+        return fake_source
+    if spec.startswith('recorded:'):
+        return recorded_source(spec.split(':', 1)[1])
+    raise argparse.ArgumentTypeError(f"Source inconnue : {spec}")
+
 if __name__ == "__main__":
-    historical_data()
+    # python3 historicaldata.py ANET AAPL MSFT                      (rattrapage incrémental, quotidien)
+    # python3 historicaldata.py ANET --full                          (téléchargement complet)
+    # python3 historicaldata.py ANET --source recorded:./enregistrements
+    parser = argparse.ArgumentParser(description="Rattrapage de l'historique des prix de clôture")
+    parser.add_argument('tickers', nargs='*', default=[price_store.DEFAULT_SYMBOL])
+    parser.add_argument('--source', type=make_source, default=yfinance_source, help="yfinance, fake ou recorded:<dossier>")
+    parser.add_argument('--start', default=DEFAULT_START, help="début de l'historique pour un ticker sans données")
+    parser.add_argument('--end', default=None, help="fin exclue (par défaut : aujourd'hui)")
+    parser.add_argument('--chunk-days', type=int, default=CHUNK_DAYS, help="jours par téléchargement")
+    parser.add_argument('--workers', type=int, default=4, help="tickers téléchargés en parallèle")
+    parser.add_argument('--full', action='store_true', help="tout retélécharger et réécrire la série")
+    args = parser.parse_args()
+    if args.full:
+        for ticker in args.tickers:
+            historical_data(ticker, args.start, args.end, args.source)
+    else:
+        backfill_all(args.tickers, args.source, args.workers, start_date=args.start, end_date=args.end, chunk_days=args.chunk_days)
@@ -0,0 +1,236 @@
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# Périodes proposées dans le tableau de bord
+PERIODS = (5, 10, 20, 50, 100, 200)
+
+class Indicator:
+    """Valeurs d'un indicateur sur toute la série : calcul vectorisé initial, puis un pas O(1) par tick ajouté.
+
+    Les tableaux ont une capacité doublée à chaque agrandissement : un ajout ne recopie pas l'historique,
+    et les vues déjà renvoyées restent valides.
+    """
+
+    outputs = ()
+
+    def __init__(self, period):
+        self.period = period
+        self.size = 0
+        self.arrays = {}
+
+    def build(self, prices):
+        values = self.batch(np.asarray(prices, dtype='float64'))
+        self.arrays = {name: np.array(values[name], dtype='float64') for name in self.outputs}
+        self.size = len(prices)
+        self.init_state(prices)
+
+    def update(self, prices):
+        for price in prices:
+            row = self.step(float(price))
+            if self.size == len(self.arrays[self.outputs[0]]):
+                capacity = max(16, 2 * self.size)
+                for name in self.outputs:
+                    grown = np.empty(capacity, dtype='float64')
+                    grown[:self.size] = self.arrays[name][:self.size]
+                    self.arrays[name] = grown
+            for name, value in zip(self.outputs, row):
+                self.arrays[name][self.size] = value
+            self.size += 1
+
+    def values(self):
+        return {name: array[:self.size] for name, array in self.arrays.items()}
+
+    def state(self):
+        # État du pas incrémental qui ne se déduit pas des prix ni des valeurs (conservé dans l'instantané de démarrage)
+        return {}
+
+    def restore(self, arrays, prices, state):
+        # Valeurs déjà calculées sur `prices` (tableaux en lecture seule : le premier ajout les recopie en les agrandissant)
+        self.arrays = dict(arrays)
+        self.size = len(prices)
+        self.init_state(prices)
+
+class SMA(Indicator):
+    outputs = ('SMA',)
+
+    def batch(self, prices):
+        # Même convention que rolling(min_periods=1) : moyenne partielle sur les premiers ticks
+        return {'SMA': pd.Series(prices).rolling(self.period, min_periods=1).mean().to_numpy()}
+
+    def init_state(self, prices):
+        self.window = deque((float(p) for p in prices[-self.period:]), maxlen=self.period)
+        self.total = sum(self.window)
+        self.steps = 0
+
+    def step(self, price):
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(price)
+        self.total += price
+        self.steps += 1
+        if self.steps % self.period == 0:
+            # Somme recalculée à chaque tour de fenêtre pour ne pas accumuler d'erreurs d'arrondi
+            self.total = sum(self.window)
+        return (self.total / len(self.window),)
+
+class EMA(Indicator):
+    outputs = ('EMA',)
+
+    def batch(self, prices):
+        return {'EMA': pd.Series(prices).ewm(span=self.period, adjust=False).mean().to_numpy()}
+
+    def init_state(self, prices):
+        self.alpha = 2 / (self.period + 1)
+        self.last = self.arrays['EMA'][self.size - 1] if self.size else None
+
+    def step(self, price):
+        self.last = price if self.last is None else self.last + self.alpha * (price - self.last)
+        return (self.last,)
+
+class Bollinger(Indicator):
+    # Bandes à deux écarts-types (population) autour de la SMA de la même période
+    outputs = ('BB_UPPER', 'BB_LOWER')
+    width = 2.0
+
+    def batch(self, prices):
+        rolling = pd.Series(prices).rolling(self.period, min_periods=1)
+        mean = rolling.mean().to_numpy()
+        std = rolling.std(ddof=0).to_numpy()
+        return {'BB_UPPER': mean + self.width * std, 'BB_LOWER': mean - self.width * std}
+
+    def init_state(self, prices):
+        self.window = deque((float(p) for p in prices[-self.period:]), maxlen=self.period)
+        self.recenter()
+        self.steps = 0
+
+    def recenter(self):
+        # Sommes décalées par une référence proche des prix : la variance reste précise sur de longues séries
+        self.reference = sum(self.window) / len(self.window) if self.window else 0.0
+        self.sum = sum(p - self.reference for p in self.window)
+        self.sumsq = sum((p - self.reference) ** 2 for p in self.window)
+
+    def step(self, price):
+        if len(self.window) == self.period:
+            old = self.window[0] - self.reference
+            self.sum -= old
+            self.sumsq -= old * old
+        self.window.append(price)
+        self.sum += price - self.reference
+        self.sumsq += (price - self.reference) ** 2
+        self.steps += 1
+        if self.steps % self.period == 0:
+            self.recenter()
+        count = len(self.window)
+        mean = self.sum / count
+        std = max(self.sumsq / count - mean * mean, 0.0) ** 0.5
+        mean += self.reference
+        return mean + self.width * std, mean - self.width * std
+
+class RSI(Indicator):
+    # RSI de Wilder (moyennes exponentielles de coefficient 1/période)
+    outputs = ('RSI',)
+
+    def batch(self, prices):
+        delta = np.diff(prices, prepend=prices[:1])
+        gains = pd.Series(np.clip(delta, 0, None)).ewm(alpha=1 / self.period, adjust=False).mean().to_numpy()
+        losses = pd.Series(np.clip(-delta, 0, None)).ewm(alpha=1 / self.period, adjust=False).mean().to_numpy()
+        self.averages = (gains[-1], losses[-1]) if len(prices) else (0.0, 0.0)
+        return {'RSI': rsi(gains, losses)}
+
+    def init_state(self, prices):
+        self.gain, self.loss = self.averages
+        self.last = float(prices[-1]) if len(prices) else None
+
+    def state(self):
+        return {'averages': [self.gain, self.loss]}
+
+    def restore(self, arrays, prices, state):
+        self.averages = tuple(state['averages'])
+        super().restore(arrays, prices, state)
+
+    def step(self, price):
+        delta = 0.0 if self.last is None else price - self.last
+        self.last = price
+        alpha = 1 / self.period
+        self.gain += alpha * (max(delta, 0.0) - self.gain)
+        self.loss += alpha * (max(-delta, 0.0) - self.loss)
+        if self.loss == 0:
+            return (50.0 if self.gain == 0 else 100.0,)
+        return (100 - 100 / (1 + self.gain / self.loss),)
+
+def rsi(gains, losses):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = 100 - 100 / (1 + gains / losses)
+    # Aucune baisse : 100 ; ni hausse ni baisse : 50
+    values[losses == 0] = 100.0
+    values[(losses == 0) & (gains == 0)] = 50.0
+    return values
+
+KINDS = {'sma': SMA, 'ema': EMA, 'bollinger': Bollinger, 'rsi': RSI}
+
+class IndicatorEngine:
+    """Indicateurs d'un symbole par (type, période), calculés au premier accès puis mis à jour à chaque ajout.
+
+    Comme TimeWindows, les valeurs sont liées au DataFrame chargé : un lecteur qui tient encore un ancien
+    DataFrame obtient un calcul direct, sans toucher à l'état partagé.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.frame = None
+        self.indicators = {}
+
+    def rebuild(self, df):
+        with self.lock:
+            self.frame = df
+            self.indicators = {}
+
+    def update(self, df):
+        # Seules les lignes ajoutées depuis le DataFrame précédent passent par step()
+        with self.lock:
+            if self.frame is None:
+                self.frame = df
+                return
+            new_prices = df['Price'].to_numpy()[len(self.frame):]
+            for indicator in self.indicators.values():
+                indicator.update(new_prices)
+            self.frame = df
+
+    def restore(self, df, rows, saved):
+        """Indicateurs relus d'un instantané calculé sur les `rows` premières lignes de `df`, complétés avec les suivantes."""
+        prices = df['Price'].to_numpy()
+        with self.lock:
+            self.frame = df
+            self.indicators = {}
+            for kind, period, arrays, state in saved:
+                indicator = self.indicators[(kind, period)] = KINDS[kind](period)
+                indicator.restore(arrays, prices[:rows], state)
+                indicator.update(prices[rows:])
+
+    def saved(self, df):
+        # (type, période, valeurs, état) des indicateurs déjà calculés sur `df`, pour l'instantané de démarrage
+        with self.lock:
+            if df is not self.frame:
+                return []
+            return [(kind, period, indicator.values(), indicator.state()) for (kind, period), indicator in self.indicators.items()]
+
+    def values(self, df, kind, period):
+        """Dictionnaire sortie -> tableau aligné sur les lignes de `df`."""
+        with self.lock:
+            if df is self.frame:
+                indicator = self.indicators.get((kind, period))
+                if indicator is None:
+                    indicator = self.indicators[(kind, period)] = KINDS[kind](period)
+                    indicator.build(df['Price'].to_numpy())
+                return indicator.values()
+        indicator = KINDS[kind](period)
+        indicator.build(df['Price'].to_numpy())
+        return indicator.values()
+
+    def active(self):
+        # (type, période) déjà calculés, dont les valeurs peuvent être poussées avec chaque tick
+        with self.lock:
+            return list(self.indicators)
@@ -0,0 +1,221 @@
+import fcntl
+import logging
+import os
+import re
+import struct
+import sys
+import zlib
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+import price_store
+
+# Journal d'écriture (write-ahead log) des ticks scrapés, commun à tous les écrivains (scrape.sh, scraper.py).
+# Un lot de ticks validés y est ajouté avec un seul fsync, puis reporté sans fsync dans les séries `<TICKER>/recent` :
+# c'est le journal qui rend le lot durable. Au-delà de CHECKPOINT_BYTES, les séries reportées sont synchronisées
+# sur disque puis le journal est vidé. Après un arrêt brutal, les ticks journalisés sont reportés à nouveau
+# par le premier lot de l'écrivain suivant (ou par `python3 ingest.py compact`) ; le report est idempotent,
+# les horodatages déjà stockés étant ignorés.
+WAL_DIR = os.path.join(price_store.STORE_DIR, '_wal')
+WAL_FILE = os.path.join(WAL_DIR, 'ticks.wal')
+
+# Taille du journal déclenchant la synchronisation des séries et sa remise à zéro (environ 7 000 ticks)
+CHECKPOINT_BYTES = 256 * 1024
+
+# Enregistrement : symbole (ASCII, complété par des zéros), horodatage ns UTC, prix, CRC32 des champs précédents
+RECORD = struct.Struct('<16sqdI')
+# Le symbole sert de nom de dossier dans le stockage : premier caractère alphanumérique (ni '.', ni '..', ni '-x')
+SYMBOL_RE = re.compile(r'^[A-Z0-9][A-Z0-9.\-]{0,15}$')
+
+# Horodatages acceptés : pas plus de 5 minutes dans le futur (horloge du scraper en avance)
+MAX_CLOCK_SKEW = pd.Timedelta(minutes=5)
+
+def validate(symbol, timestamp, price, now=None):
+    """Renvoie (symbole, horodatage ns UTC, prix) ou lève ValueError si le tick est invalide."""
+    symbol = str(symbol).strip().upper()
+    if not SYMBOL_RE.fullmatch(symbol):
+        raise ValueError(f"Symbole invalide : {symbol!r}")
+    try:
+        price = float(str(price).replace(',', '').strip())
+    except ValueError:
+        raise ValueError(f"Prix invalide : {price!r}") from None
+    if not np.isfinite(price) or price <= 0:
+        raise ValueError(f"Prix invalide : {price}")
+    try:
+        moment = pd.Timestamp(timestamp)
+    except (ValueError, TypeError):
+        raise ValueError(f"Horodatage invalide : {timestamp!r}") from None
+    if pd.isna(moment):
+        raise ValueError(f"Horodatage invalide : {timestamp!r}")
+    moment = moment.tz_localize('UTC') if moment.tzinfo is None else moment.tz_convert('UTC')
+    if moment > (now or pd.Timestamp.now(tz='UTC')) + MAX_CLOCK_SKEW:
+        raise ValueError(f"Horodatage dans le futur : {moment.isoformat()}")
+    return symbol, moment.value, price
+
+def encode(symbol, time_ns, price):
+    fields = struct.pack('<16sqd', symbol.encode('ascii'), time_ns, price)
+    return fields + struct.pack('<I', zlib.crc32(fields))
+
+class TickLog:
+    """Journal en ajout seul, protégé par un verrou flock : un seul écrivain à la fois, tous processus confondus."""
+
+    def __init__(self, path=WAL_FILE):
+        self.path = path
+
+    @contextmanager
+    def locked(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f"{self.path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def replay(self):
+        """Enregistrements complets et intacts du journal, et la taille en octets qu'ils occupent.
+
+        La lecture s'arrête au premier enregistrement tronqué ou corrompu (écriture interrompue).
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return [], 0
+        records = []
+        for offset in range(0, len(data) - RECORD.size + 1, RECORD.size):
+            symbol, time_ns, price, crc = RECORD.unpack_from(data, offset)
+            if zlib.crc32(data[offset:offset + RECORD.size - 4]) != crc:
+                break
+            records.append((symbol.rstrip(b'\0').decode('ascii'), time_ns, price))
+        return records, len(records) * RECORD.size
+
+    def valid_size(self):
+        # Taille occupée par les enregistrements complets : seul le dernier est vérifié, le journal entier
+        # n'est relu que si sa fin est tronquée ou corrompue (écriture interrompue)
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+        if size % RECORD.size == 0:
+            if size == 0:
+                return 0
+            with open(self.path, 'rb') as f:
+                f.seek(size - RECORD.size)
+                last = f.read(RECORD.size)
+            if zlib.crc32(last[:-4]) == RECORD.unpack(last)[3]:
+                return size
+        return self.replay()[1]
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def append(self, ticks):
+        # À appeler sous verrou : une fin tronquée par un arrêt brutal est coupée avant d'écrire à la suite
+        valid_size = self.valid_size()
+        with open(self.path, 'ab') as f:
+            if f.tell() != valid_size:
+                f.truncate(valid_size)
+            f.write(b''.join(encode(*tick) for tick in ticks))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def apply(self, records):
+        """Reporte `records` dans les séries récentes, sans fsync ; renvoie {symbole: lignes ajoutées}.
+
+        À appeler sous verrou, pour des enregistrements déjà journalisés : ils y restent jusqu'au prochain checkpoint().
+        """
+        by_symbol = {}
+        for symbol, time_ns, price in records:
+            times, prices = by_symbol.setdefault(symbol, ([], []))
+            times.append(time_ns)
+            prices.append(price)
+        return {symbol: price_store.append_new(price_store.recent_series(symbol), times, prices, sync=False)
+                for symbol, (times, prices) in by_symbol.items()}
+
+    def checkpoint(self, records=None):
+        # À appeler sous verrou, après apply() : séries des ticks journalisés écrites sur disque, puis journal vidé
+        if records is None:
+            records, _ = self.replay()
+        for symbol in {symbol for symbol, _, _ in records}:
+            price_store.sync_series(price_store.recent_series(symbol))
+        if os.path.exists(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(0)
+                os.fsync(f.fileno())
+
+    def compact(self):
+        """Reporte tous les ticks journalisés dans les séries récentes puis vide le journal ; renvoie {symbole: lignes ajoutées}.
+
+        À appeler sous verrou. append_new ignore les horodatages déjà stockés : un report interrompu peut être
+        rejoué sans doublon.
+        """
+        records, _ = self.replay()
+        added = self.apply(records)
+        self.checkpoint(records)
+        return added
+
+class Ingestor:
+    """Ticks validés en attente, écrits par lots : un fsync du journal par lot, puis report dans le stockage."""
+
+    def __init__(self, log=None, batch_size=100, checkpoint_bytes=CHECKPOINT_BYTES):
+        self.log = log or TickLog()
+        self.batch_size = batch_size
+        self.checkpoint_bytes = checkpoint_bytes
+        self.pending = []
+        self.rejected = 0
+        # Le premier lot reporte tout le journal : ticks d'un écrivain arrêté avant leur report
+        self.recovered = False
+
+    def add(self, symbol, timestamp, price):
+        # Renvoie False (et journalise la raison) si le tick est rejeté
+        try:
+            self.pending.append(validate(symbol, timestamp, price))
+        except ValueError as e:
+            self.rejected += 1
+            logging.warning(f"Tick rejeté ({symbol}) : {e}")
+            return False
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Journalise puis reporte les ticks en attente ; renvoie {symbole: lignes ajoutées} (doublons exclus)."""
+        with self.log.locked():
+            records, self.pending = self.pending, []
+            if records:
+                self.log.append(records)
+            if not self.recovered:
+                records, _ = self.log.replay()
+                self.recovered = True
+            added = self.log.apply(records)
+            if self.log.size() >= self.checkpoint_bytes:
+                self.log.checkpoint()
+            return added
+
+if __name__ == '__main__':
+    # python3 ingest.py add ANET 2025-04-07T15:30:00+02:00 123.45
+    # python3 ingest.py compact                                   (report des ticks journalisés après un arrêt brutal)
+    if len(sys.argv) == 5 and sys.argv[1] == 'add':
+        ingestor = Ingestor()
+        try:
+            ingestor.pending.append(validate(*sys.argv[2:5]))
+        except ValueError as e:
+            print(f"Erreur : {e}", file=sys.stderr)
+            sys.exit(1)
+        added = ingestor.flush()
+        if not any(added.values()):
+            print(f"Tick ignoré (déjà stocké ou antérieur au dernier tick) : {sys.argv[2:5]}", file=sys.stderr)
+    elif len(sys.argv) == 2 and sys.argv[1] == 'compact':
+        log = TickLog()
+        with log.locked():
+            added = log.compact()
+        print(f"{sum(added.values())} ticks reportés")
+    else:
+        print("Usage : ingest.py add <TICKER> <horodatage ISO> <prix> | compact")
+        sys.exit(1)
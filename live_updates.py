@@ -0,0 +1,63 @@
+import json
+import queue
+import threading
+
+class Broadcaster:
+    """Diffusion des nouveaux ticks aux onglets abonnés à un symbole (une file par connexion SSE)."""
+
+    def __init__(self, maxsize=100):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.subscribers = {}
+
+    def subscribe(self, symbol):
+        subscriber = queue.Queue(maxsize=self.maxsize)
+        with self.lock:
+            self.subscribers.setdefault(symbol.upper(), set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, symbol, subscriber):
+        with self.lock:
+            subscribers = self.subscribers.get(symbol.upper())
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self.subscribers[symbol.upper()]
+
+    def has_subscribers(self, symbol):
+        with self.lock:
+            return symbol.upper() in self.subscribers
+
+    def publish(self, symbol, message):
+        # Ne bloque jamais l'écrivain : un onglet trop lent reçoit un message de resynchronisation complète
+        with self.lock:
+            subscribers = list(self.subscribers.get(symbol.upper(), ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                with subscriber.mutex:
+                    subscriber.queue.clear()
+                subscriber.put_nowait(dict(message, reset=True, ticks=[]))
+
+    def __len__(self):
+        with self.lock:
+            return sum(len(subscribers) for subscribers in self.subscribers.values())
+
+def event_stream(broadcaster, symbol, poll=None, timeout=15):
+    # Générateur text/event-stream : un message par publication, un commentaire keep-alive sinon.
+    # `poll` est appelé à chaque keep-alive (rechargement par signature quand inotify est indisponible).
+    subscriber = broadcaster.subscribe(symbol)
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                message = subscriber.get(timeout=timeout)
+            except queue.Empty:
+                if poll is not None:
+                    poll()
+                yield ": keep-alive\n\n"
+                continue
+            yield f"data: {json.dumps(message)}\n\n"
+    finally:
+        broadcaster.unsubscribe(symbol, subscriber)
@@ -0,0 +1,125 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+# Calendrier des séances du NYSE (ANET y est cotée) : ouverture 9h30, clôture 16h00 heure de New York,
+# 13h00 les jours de clôture anticipée. Les séances sont précalculées en tableaux (jour, ouverture, clôture
+# en ns UTC) : un tick est rattaché à sa séance par une recherche dichotomique, sans boucle Python par ligne.
+TIMEZONE = 'America/New_York'
+OPEN_TIME = datetime.time(9, 30)
+CLOSE_TIME = datetime.time(16, 0)
+EARLY_CLOSE_TIME = datetime.time(13, 0)
+FIRST_YEAR = 1990
+DAY_NS = 86400 * 10**9
+
+# Fermetures exceptionnelles (attentats, ouragan, funérailles nationales)
+SPECIAL_CLOSURES = [
+    datetime.date(2001, 9, 11), datetime.date(2001, 9, 12), datetime.date(2001, 9, 13), datetime.date(2001, 9, 14),
+    datetime.date(2004, 6, 11), datetime.date(2007, 1, 2), datetime.date(2012, 10, 29), datetime.date(2012, 10, 30),
+    datetime.date(2018, 12, 5), datetime.date(2025, 1, 9),
+]
+
+def easter(year):
+    # Dimanche de Pâques (calendrier grégorien, algorithme de Meeus/Jones/Butcher)
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+def nth_weekday(year, month, weekday, n):
+    # n-ième jour `weekday` (0 = lundi) du mois ; n = -1 pour le dernier
+    if n > 0:
+        first = datetime.date(year, month, 1)
+        return first + datetime.timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = datetime.date(year + month // 12, month % 12 + 1, 1) - datetime.timedelta(days=1)
+    return last - datetime.timedelta(days=(last.weekday() - weekday) % 7)
+
+def observed(date):
+    # Férié tombant un samedi : chômé le vendredi ; un dimanche : le lundi
+    if date.weekday() == 5:
+        return date - datetime.timedelta(days=1)
+    if date.weekday() == 6:
+        return date + datetime.timedelta(days=1)
+    return date
+
+def holidays(year):
+    days = [
+        nth_weekday(year, 2, 0, 3),                     # Presidents' Day
+        easter(year) - datetime.timedelta(days=2),      # Vendredi saint
+        nth_weekday(year, 5, 0, -1),                    # Memorial Day
+        observed(datetime.date(year, 7, 4)),            # Independence Day
+        nth_weekday(year, 9, 0, 1),                     # Labor Day
+        nth_weekday(year, 11, 3, 4),                    # Thanksgiving
+        observed(datetime.date(year, 12, 25)),          # Noël
+    ]
+    # Jour de l'an : pas de report au vendredi 31 décembre quand il tombe un samedi
+    if datetime.date(year, 1, 1).weekday() != 5:
+        days.append(observed(datetime.date(year, 1, 1)))
+    if year >= 1998:
+        days.append(nth_weekday(year, 1, 0, 3))         # Martin Luther King Jr. Day
+    if year >= 2022:
+        days.append(observed(datetime.date(year, 6, 19)))  # Juneteenth
+    return days
+
+def early_closes(year):
+    # Veille de l'Independence Day et de Noël (du lundi au jeudi), lendemain de Thanksgiving
+    days = [nth_weekday(year, 11, 3, 4) + datetime.timedelta(days=1)]
+    for date in (datetime.date(year, 7, 3), datetime.date(year, 12, 24)):
+        if date.weekday() < 4:
+            days.append(date)
+    return days
+
+class MarketCalendar:
+    """Séances d'une place de marché : jours (datetime64[D]) et bornes d'ouverture / clôture en ns UTC, triés."""
+
+    def __init__(self, first_year=FIRST_YEAR, last_year=None):
+        last_year = last_year or pd.Timestamp.now().year + 1
+        closed = set(SPECIAL_CLOSURES)
+        early = set()
+        for year in range(first_year, last_year + 1):
+            closed.update(holidays(year))
+            early.update(early_closes(year))
+        days = np.arange(np.datetime64(f"{first_year}-01-01"), np.datetime64(f"{last_year + 1}-01-01"))
+        self.days = days[np.is_busday(days, holidays=sorted(closed))]
+        is_early = np.isin(self.days, np.array(sorted(early), dtype='datetime64[D]'))
+        self.opens = self.boundaries(OPEN_TIME)
+        self.closes = np.where(is_early, self.boundaries(EARLY_CLOSE_TIME), self.boundaries(CLOSE_TIME))
+
+    def boundaries(self, time):
+        # Heure de New York de chaque séance convertie en UTC (changements d'heure américains compris)
+        local = pd.DatetimeIndex(self.days.astype('datetime64[ns]')) + pd.Timedelta(hours=time.hour, minutes=time.minute)
+        return local.tz_localize(TIMEZONE).tz_convert('UTC').to_numpy(dtype='datetime64[ns]').view('int64')
+
+    def session_ids(self, times_ns):
+        """Indice de séance de chaque horodatage (ns UTC), -1 hors séance.
+
+        Les barres journalières de l'historique, horodatées à minuit UTC, sont rattachées à la séance de leur date UTC.
+        """
+        times_ns = np.asarray(times_ns, dtype='int64')
+        ids = np.searchsorted(self.opens, times_ns, side='right') - 1
+        in_session = (ids >= 0) & (times_ns <= self.closes[np.maximum(ids, 0)])
+        ids = np.where(in_session, ids, -1)
+        daily = times_ns % DAY_NS == 0
+        if daily.any():
+            days = times_ns[daily].view('datetime64[ns]').astype('datetime64[D]')
+            positions = np.minimum(np.searchsorted(self.days, days), len(self.days) - 1)
+            ids[daily] = np.where(self.days[positions] == days, positions, -1)
+        return ids
+
+    def is_session(self, date):
+        day = np.datetime64(pd.Timestamp(date).date(), 'D')
+        position = np.searchsorted(self.days, day)
+        return bool(position < len(self.days) and self.days[position] == day)
+
+    def previous_session(self, date):
+        """Dernière séance tenue le jour `date` ou avant (datetime.date), ou None."""
+        position = np.searchsorted(self.days, np.datetime64(pd.Timestamp(date).date(), 'D'), side='right') - 1
+        return None if position < 0 else pd.Timestamp(self.days[position]).date()
+
+NYSE = MarketCalendar()
@@ -0,0 +1,126 @@
+import bisect
+import cProfile
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Bornes des histogrammes : durées en secondes, tailles de réponse en octets
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (1e3, 1e4, 1e5, 3e5, 1e6, 3e6, 1e7)
+
+def label_text(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+def number(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class Metrics:
+    """Compteurs, jauges et histogrammes du processus, exposés au format texte Prometheus.
+
+    Chaque worker gunicorn tient ses propres valeurs.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.kinds = {}
+        self.help = {}
+        self.values = {}
+
+    def describe(self, name, kind, help_text):
+        self.kinds[name] = kind
+        self.help[name] = help_text
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        # Valeurs tenues ailleurs (compteurs des caches), recopiées au moment de l'export
+        with self.lock:
+            self.values[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name, value, buckets=DURATION_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.values.get(key)
+            if histogram is None:
+                histogram = self.values[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def span(self, stage, **labels):
+        """Durée d'une étape (load, filter, indicator, figure-build, serialize) dans dashboard_stage_seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('dashboard_stage_seconds', time.perf_counter() - start, stage=stage, **labels)
+
+    def render(self):
+        with self.lock:
+            items = sorted(self.values.items(), key=lambda item: item[0])
+            lines = []
+            described = set()
+            for (name, labels), value in items:
+                if name not in described:
+                    described.add(name)
+                    if name in self.help:
+                        lines.append(f"# HELP {name} {self.help[name]}")
+                    lines.append(f"# TYPE {name} {self.kinds.get(name, 'untyped')}")
+                if isinstance(value, Histogram):
+                    cumulative = 0
+                    for bound, count in zip(value.buckets + (float('inf'),), value.counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else number(bound)
+                        lines.append(f"{name}_bucket{label_text(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{label_text(labels)} {repr(value.sum)}")
+                    lines.append(f"{name}_count{label_text(labels)} {value.count}")
+                else:
+                    lines.append(f"{name}{label_text(labels)} {number(value)}")
+        return '\n'.join(lines) + '\n'
+
+class RequestProfiler:
+    """Profil cProfile d'une requête, écrit dans `directory` (un fichier .prof par requête).
+
+    Une seule requête est profilée à la fois : les requêtes simultanées passent sans profil.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def start(self):
+        if not self.lock.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # Un autre profileur est déjà actif
+            self.lock.release()
+            return None
+        return profile
+
+    def stop(self, profile, name):
+        profile.disable()
+        self.lock.release()
+        safe_name = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in name)[:80]
+        path = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}-{safe_name}.prof")
+        profile.dump_stats(path)
+        return path
@@ -0,0 +1,241 @@
+import fcntl
+import os
+import sys
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# Stockage binaire en colonnes, partitionné par symbole : un dossier par série (<SYMBOLE>/historical,
+# <SYMBOLE>/recent), contenant
+#   time.i8  : horodatages UTC en nanosecondes depuis l'epoch (int64 little-endian)
+#   price.f8 : prix (float64 little-endian)
+# Les deux fichiers sont en ajout seul et lus par memory-mapping (aucune copie ni parsing).
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.environ.get('PRICE_STORE_DIR', os.path.join(BASE_DIR, 'store'))
+HISTORICAL = 'historical'
+RECENT = 'recent'
+KINDS = (HISTORICAL, RECENT)
+
+DEFAULT_SYMBOL = 'ANET'
+
+TIME_DTYPE = np.dtype('<i8')
+PRICE_DTYPE = np.dtype('<f8')
+COLUMNS = (('time.i8', TIME_DTYPE), ('price.f8', PRICE_DTYPE))
+
+def series_name(symbol, kind):
+    return os.path.join(symbol.upper(), kind)
+
+def historical_series(symbol):
+    return series_name(symbol, HISTORICAL)
+
+def recent_series(symbol):
+    return series_name(symbol, RECENT)
+
+def symbols():
+    # Symboles disponibles : dossiers de premier niveau contenant au moins une série
+    if not os.path.isdir(STORE_DIR):
+        return []
+    return sorted(
+        entry for entry in os.listdir(STORE_DIR)
+        if not entry.startswith(('_', '.')) and any(exists(series_name(entry, kind)) for kind in KINDS)
+    )
+
+def series_dir(name):
+    return os.path.join(STORE_DIR, name)
+
+def column_paths(name):
+    return [os.path.join(series_dir(name), filename) for filename, _ in COLUMNS]
+
+def exists(name):
+    return all(os.path.exists(path) for path in column_paths(name))
+
+@contextmanager
+def locked(name, exclusive):
+    # Verrou consultatif par série : partagé pour les lecteurs, exclusif pour les écrivains
+    os.makedirs(series_dir(name), exist_ok=True)
+    with open(os.path.join(series_dir(name), '.lock'), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def signature(name):
+    # (inode, taille, mtime) des deux colonnes, utilisée pour invalider les caches
+    sig = []
+    for path in column_paths(name):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        sig.append((st.st_ino, st.st_size, st.st_mtime_ns))
+    return tuple(sig)
+
+def map_column(path, dtype, start, stop):
+    if stop <= start:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=start * dtype.itemsize, shape=(stop - start,))
+
+def row_count(name):
+    # Une écriture interrompue peut laisser une colonne plus longue : seules les lignes complètes comptent
+    sizes = []
+    for path, (_, dtype) in zip(column_paths(name), COLUMNS):
+        try:
+            sizes.append(os.path.getsize(path) // dtype.itemsize)
+        except OSError:
+            return 0
+    return min(sizes)
+
+def read_series(name, start=0, stop=None):
+    """Renvoie (times_ns, prices) des lignes `start` à `stop`, en vues memory-mappées."""
+    if not exists(name):
+        return np.empty(0, dtype=TIME_DTYPE), np.empty(0, dtype=PRICE_DTYPE)
+    with locked(name, exclusive=False):
+        stop = row_count(name) if stop is None else min(stop, row_count(name))
+        start = min(start, stop)
+        return tuple(map_column(path, dtype, start, stop) for path, (_, dtype) in zip(column_paths(name), COLUMNS))
+
+def repair(name):
+    # Tronque les colonnes à la dernière ligne complète avant d'ajouter
+    rows = row_count(name)
+    for path, (_, dtype) in zip(column_paths(name), COLUMNS):
+        if os.path.exists(path) and os.path.getsize(path) != rows * dtype.itemsize:
+            os.truncate(path, rows * dtype.itemsize)
+
+def clean_columns(times_ns, prices):
+    """Lignes à prix fini et positif, triées, sans horodatage en double (première occurrence gardée).
+
+    C'est la forme garantie de toutes les séries sources : les lecteurs n'ont pas à la revérifier.
+    """
+    times_ns, prices = check_columns(times_ns, prices)
+    mask = np.isfinite(prices) & (prices > 0)
+    if not mask.all():
+        times_ns, prices = times_ns[mask], prices[mask]
+    if len(times_ns) > 1 and (np.diff(times_ns) <= 0).any():
+        order = np.argsort(times_ns, kind='stable')
+        times_ns, prices = times_ns[order], prices[order]
+        keep = np.ones(len(times_ns), dtype=bool)
+        keep[1:] = times_ns[1:] != times_ns[:-1]
+        times_ns, prices = times_ns[keep], prices[keep]
+    return times_ns, prices
+
+def check_columns(times_ns, prices):
+    times_ns = np.ascontiguousarray(times_ns, dtype=TIME_DTYPE)
+    prices = np.ascontiguousarray(prices, dtype=PRICE_DTYPE)
+    if len(times_ns) != len(prices):
+        raise ValueError("Les colonnes time et price n'ont pas la même longueur")
+    return times_ns, prices
+
+def write_columns(name, times_ns, prices, sync=False):
+    # Ajout brut en fin de colonnes, à appeler sous verrou exclusif après repair()
+    for path, values in zip(column_paths(name), (times_ns, prices)):
+        with open(path, 'ab') as f:
+            f.write(values.tobytes())
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+
+def append_series(name, times_ns, prices):
+    # Ajout sans contrôle : séries préparées, ou lignes déjà validées et postérieures à la série
+    times_ns, prices = check_columns(times_ns, prices)
+    with locked(name, exclusive=True):
+        repair(name)
+        write_columns(name, times_ns, prices)
+
+def last_time(name):
+    # Horodatage (ns UTC) de la dernière ligne complète, ou None si la série est vide
+    rows = row_count(name)
+    if rows == 0:
+        return None
+    return int(map_column(column_paths(name)[0], TIME_DTYPE, rows - 1, rows)[0])
+
+def append_new(name, times_ns, prices, sync=True):
+    """Ajoute les lignes postérieures à la dernière ligne stockée (sans doublon) et renvoie leur nombre.
+
+    Avec `sync=False`, l'appelant garantit la durabilité autrement (journal d'ingestion, puis sync_series).
+    """
+    # Prix invalides et horodatages en double dans le lot écartés avant l'écriture
+    times_ns, prices = clean_columns(times_ns, prices)
+    with locked(name, exclusive=True):
+        repair(name)
+        last = last_time(name)
+        if last is not None:
+            keep = times_ns > last
+            times_ns, prices = times_ns[keep], prices[keep]
+        if len(times_ns):
+            # fsync des deux colonnes : un import interrompu reprend depuis la dernière ligne complète
+            write_columns(name, times_ns, prices, sync=sync)
+    return len(times_ns)
+
+def sync_series(name):
+    # fsync des colonnes d'une série écrite sans synchronisation
+    for path in column_paths(name):
+        if os.path.exists(path):
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+def write_series(name, times_ns, prices):
+    # Réécriture complète : fichiers temporaires puis remplacement atomique sous verrou exclusif
+    times_ns, prices = check_columns(times_ns, prices)
+    with locked(name, exclusive=True):
+        for path, values in zip(column_paths(name), (times_ns, prices)):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(values.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+
+def to_frame(times_ns, prices):
+    return pd.DataFrame({
+        'Time': pd.to_datetime(times_ns, unit='ns', utc=True),
+        'Price': prices,
+    })
+
+def parse_csv(path, historical):
+    if historical:
+        df = pd.read_csv(path).rename(columns={'Date': 'Time'})[['Time', 'Price']]
+    else:
+        df = pd.read_csv(path, names=['Time', 'Price'])
+    df['Time'] = pd.to_datetime(df['Time'], utc=True)
+    # Prix illisibles (ancien scrape.sh : lignes sans prix) convertis en NaN puis écartés par clean_columns
+    df['Price'] = pd.to_numeric(df['Price'], errors='coerce')
+    return clean_columns(df['Time'].to_numpy(dtype='datetime64[ns]').view(TIME_DTYPE), df['Price'].to_numpy(dtype=PRICE_DTYPE))
+
+def migrate_csv(name, path, historical):
+    """Import unique d'un CSV existant vers le stockage binaire."""
+    times_ns, prices = parse_csv(path, historical)
+    write_series(name, times_ns, prices)
+    return len(prices)
+
+def append_tick(name, timestamp, price):
+    # Ajout direct d'un tick (ligne de commande) ; les scrapers passent par ingest.py, qui regroupe les écritures
+    price = float(str(price).replace(',', ''))
+    if not np.isfinite(price) or price <= 0:
+        raise ValueError(f"Prix invalide : {price}")
+    time = pd.Timestamp(timestamp)
+    time_ns = (time.tz_localize('UTC') if time.tzinfo is None else time.tz_convert('UTC')).value
+    return append_new(name, [time_ns], [price])
+
+if __name__ == '__main__':
+    # python3 price_store.py migrate
+    # python3 price_store.py append ANET/recent 2025-04-07T15:30:00+02:00 123.45
+    if len(sys.argv) >= 2 and sys.argv[1] == 'migrate':
+        for kind, filename, historical in ((HISTORICAL, 'historical_prices.csv', True), (RECENT, 'recent_prices.csv', False)):
+            path = os.path.join(BASE_DIR, filename)
+            name = series_name(DEFAULT_SYMBOL, kind)
+            if os.path.exists(path):
+                print(f"{filename} -> {series_dir(name)} : {migrate_csv(name, path, historical)} lignes")
+    elif len(sys.argv) == 5 and sys.argv[1] == 'append':
+        try:
+            append_tick(sys.argv[2], sys.argv[3], sys.argv[4])
+        except ValueError as e:
+            print(f"Erreur : {e}", file=sys.stderr)
+            sys.exit(1)
+    else:
+        print("Usage : price_store.py migrate | append <SYMBOLE>/<série> <horodatage ISO> <prix>")
+        sys.exit(1)
@@ -0,0 +1,134 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+MINUTE_NS = 60 * 10**9
+
+# Résolutions des barres OHLC, de la plus fine à la plus grossière : (largeur, origin) en ns d'heure locale.
+# Les semaines commencent le lundi (le 1er janvier 1970 était un jeudi).
+RESOLUTIONS = {
+    '5m': (5 * MINUTE_NS, 0),
+    '1h': (60 * MINUTE_NS, 0),
+    '1d': (1440 * MINUTE_NS, 0),
+    '1w': (7 * 1440 * MINUTE_NS, 3 * 1440 * MINUTE_NS),
+}
+
+COLUMNS = ('key', 'time', 'open', 'high', 'low', 'close', 'last_index')
+
+def local_ns(times):
+    # Heure locale (murale) de chaque tick, sans créer d'objet date Python par ligne
+    return times.dt.tz_localize(None).to_numpy(dtype='datetime64[ns]').view('int64')
+
+def aggregate(df, resolution, offset=0):
+    """Barres OHLC des ticks triés de `df` ; `last_index` est la position du dernier tick de chaque barre (+ offset)."""
+    width, origin = RESOLUTIONS[resolution]
+    if df.empty:
+        return {column: np.empty(0, dtype='float64' if column in ('open', 'high', 'low', 'close') else 'int64') for column in COLUMNS}
+    prices = df['Price'].to_numpy(dtype='float64')
+    utc = df['Time'].to_numpy(dtype='datetime64[ns]').view('int64')
+    local = local_ns(df['Time'])
+    keys = (local + origin) // width
+    # Barres = suites de ticks consécutifs de même clé (au changement d'heure d'hiver, l'heure répétée forme une autre barre)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    ends = np.append(starts[1:], len(prices))
+    return {
+        'key': keys[starts],
+        # Début de la barre en UTC : premier tick moins son avance sur le début local de la barre
+        'time': utc[starts] - (local[starts] + origin - keys[starts] * width),
+        'open': prices[starts],
+        'high': np.maximum.reduceat(prices, starts),
+        'low': np.minimum.reduceat(prices, starts),
+        'close': prices[ends - 1],
+        'last_index': ends - 1 + offset,
+    }
+
+class Rollup:
+    """Barres d'une résolution, complétées à chaque ajout de ticks (tableaux à capacité doublée, comme les indicateurs)."""
+
+    def __init__(self, resolution):
+        self.resolution = resolution
+        self.size = 0
+        self.arrays = {}
+
+    def build(self, df):
+        self.arrays = aggregate(df, self.resolution)
+        self.size = len(self.arrays['key'])
+
+    def update(self, new_rows, offset):
+        new = aggregate(new_rows, self.resolution, offset)
+        if not len(new['key']):
+            return
+        last = self.size - 1
+        if self.size and new['key'][0] == self.arrays['key'][last] and new['time'][0] == self.arrays['time'][last]:
+            # Les premiers nouveaux ticks complètent la dernière barre
+            self.arrays['high'][last] = max(self.arrays['high'][last], new['high'][0])
+            self.arrays['low'][last] = min(self.arrays['low'][last], new['low'][0])
+            self.arrays['close'][last] = new['close'][0]
+            self.arrays['last_index'][last] = new['last_index'][0]
+            new = {column: values[1:] for column, values in new.items()}
+        count = len(new['key'])
+        if self.size + count > len(self.arrays['key']):
+            capacity = max(16, 2 * (self.size + count))
+            for column, values in self.arrays.items():
+                grown = np.empty(capacity, dtype=values.dtype)
+                grown[:self.size] = values[:self.size]
+                self.arrays[column] = grown
+        for column, values in new.items():
+            self.arrays[column][self.size:self.size + count] = values
+        self.size += count
+
+    def bars(self):
+        return {column: values[:self.size] for column, values in self.arrays.items()}
+
+class Rollups:
+    """Barres OHLC d'un symbole par résolution, calculées au premier accès puis tenues à jour à chaque ajout.
+
+    Liées au DataFrame chargé, comme IndicatorEngine.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.frame = None
+        self.rollups = {}
+
+    def rebuild(self, df):
+        with self.lock:
+            self.frame = df
+            self.rollups = {}
+
+    def update(self, df):
+        with self.lock:
+            if self.frame is None:
+                self.frame = df
+                return
+            start = len(self.frame)
+            for rollup in self.rollups.values():
+                rollup.update(df.iloc[start:], start)
+            self.frame = df
+
+    def bars(self, df, resolution, start=0):
+        """Copie des barres dont le dernier tick est à la position `start` ou après (fenêtre affichée).
+
+        La copie est faite sous verrou : la dernière barre est complétée en place par update().
+        """
+        with self.lock:
+            if df is self.frame:
+                rollup = self.rollups.get(resolution)
+                if rollup is None:
+                    rollup = self.rollups[resolution] = Rollup(resolution)
+                    rollup.build(df)
+                return window(rollup.bars(), start)
+        return window(aggregate(df, resolution), start)
+
+def window(bars, start):
+    first = int(np.searchsorted(bars['last_index'], start, side='left'))
+    return {column: values[first:].copy() for column, values in bars.items()}
+
+def pick_resolution(span, min_bars):
+    """Résolution la plus grossière qui donne encore `min_bars` barres sur la durée `span` ; None : ticks bruts."""
+    for resolution in reversed(RESOLUTIONS):
+        width, _ = RESOLUTIONS[resolution]
+        if span / pd.Timedelta(width, unit='ns') >= min_bars:
+            return resolution
+    return None
@@ -1,23 +1,9 @@
 #!/bin/bash
 
-echo "Script exécuté à $(date)" >> /home/ec2-user/Web-Scrapping/debug.log
-html=$(/usr/bin/curl -s -A "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36" https://finviz.com/quote.ashx?t=ANET)
-if [ -z "$html" ]; then
-    echo "Erreur : curl n'a rien retourné" >> /home/ec2-user/Web-Scrapping/debug.log
-else
-    echo "HTML reçu : ${html:0:100}" >> /home/ec2-user/Web-Scrapping/debug.log
-fi
-price=$(echo "$html" | /usr/bin/grep -oP '(?<=<strong class="quote-price_wrapper_price">)[^<]+' | /usr/bin/head -1)
-if [ -z "$price" ]; then
-    echo "Erreur : prix non extrait" >> /home/ec2-user/Web-Scrapping/debug.log
-else
-    echo "Prix extrait : $price" >> /home/ec2-user/Web-Scrapping/debug.log
-fi
-echo "$(date '+%Y-%m-%d %H:%M:%S'),$price" >> /home/ec2-user/Web-Scrapping/prices.txt
-
 SCRIPT_DIR=$(dirname "$(realpath "$0")")
-echo "Script exécuté à $(date)" >> "$SCRIPT_DIR/debug.log"
-html=$(/usr/bin/curl -s -A "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36" https://finviz.com/quote.ashx?t=ANET)
+TICKER="${1:-ANET}"
+echo "Script exécuté à $(date) pour $TICKER" >> "$SCRIPT_DIR/debug.log"
+html=$(/usr/bin/curl -s -A "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36" "https://finviz.com/quote.ashx?t=$TICKER")
 if [ -z "$html" ]; then
     echo "Erreur : curl n'a rien retourné" >> "$SCRIPT_DIR/debug.log"
 else
@@ -28,6 +14,16 @@ if [ -z "$price" ]; then
     echo "Erreur : prix non extrait" >> "$SCRIPT_DIR/debug.log"
 else
     echo "Prix extrait : $price" >> "$SCRIPT_DIR/debug.log"
+    # prices.txt : relevés bruts d'ANET, dans le format d'origine (date,prix)
+    if [ "$TICKER" = "ANET" ]; then
+        echo "$(date '+%Y-%m-%d %H:%M:%S'),$price" >> "$SCRIPT_DIR/prices.txt"
+    fi
     TIMESTAMP=$(date --iso-8601=seconds)
-    echo "$TIMESTAMP,$price" >> "$SCRIPT_DIR/recent_prices.csv"
+    PYTHON="${PYTHON:-$SCRIPT_DIR/venv/bin/python3}"
+    # Validation, dédoublonnage et écriture journalisée (ingest.py)
+    if ! "$PYTHON" "$SCRIPT_DIR/ingest.py" add "$TICKER" "$TIMESTAMP" "$price" 2>> "$SCRIPT_DIR/debug.log"; then
+        echo "Erreur : écriture dans le stockage impossible" >> "$SCRIPT_DIR/debug.log"
+    fi
+    # Instantané de démarrage du tableau de bord, réécrit au plus tous les quarts d'heure (warm_snapshot.py)
+    "$PYTHON" "$SCRIPT_DIR/warm_snapshot.py" --max-age 900 "$TICKER" >> "$SCRIPT_DIR/debug.log" 2>&1
 fi
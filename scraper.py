@@ -0,0 +1,141 @@
+import argparse
+import asyncio
+import logging
+import os
+import re
+import sys
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from ingest import Ingestor
+
+# Scraper asynchrone longue durée : remplace l'appel cron de scrape.sh (un curl + un grep par échantillon)
+# par une session HTTP persistante (keep-alive) qui interroge plusieurs tickers en parallèle.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FINVIZ_URL = os.environ.get('FINVIZ_URL', 'https://finviz.com/quote.ashx')
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+# Instantanés de démarrage du tableau de bord (warm_snapshot.py), réécrits au plus toutes les SNAPSHOT_EVERY secondes
+SNAPSHOT_SCRIPT = os.path.join(BASE_DIR, 'warm_snapshot.py')
+SNAPSHOT_EVERY = 900.0
+PRICE_RE = re.compile(r'<strong class="quote-price_wrapper_price">\s*([^<]+?)\s*<')
+
+def parse_price(html):
+    match = PRICE_RE.search(html)
+    if match is None:
+        return None
+    try:
+        price = float(match.group(1).replace(',', ''))
+    except ValueError:
+        return None
+    return price if price > 0 else None
+
+class HostRateLimiter:
+    """Espace les requêtes vers un même hôte d'au moins 1 / `rate` secondes."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot = {}
+        self.lock = asyncio.Lock()
+
+    async def wait(self, host):
+        loop = asyncio.get_running_loop()
+        async with self.lock:
+            now = loop.time()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+class Scraper:
+    def __init__(self, tickers, base_url=FINVIZ_URL, rate=2.0, connections=4, timeout=10.0):
+        self.tickers = tickers
+        self.base_url = base_url
+        self.host = urlsplit(base_url).netloc
+        self.limiter = HostRateLimiter(rate)
+        self.connections = connections
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.session = None
+        self.ingestor = Ingestor()
+
+    async def __aenter__(self):
+        # Un seul pool de connexions pour toute la durée de vie du scraper
+        connector = aiohttp.TCPConnector(limit_per_host=self.connections, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout, headers={'User-Agent': USER_AGENT})
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    async def fetch_price(self, ticker):
+        await self.limiter.wait(self.host)
+        try:
+            async with self.session.get(self.base_url, params={'t': ticker}) as response:
+                if response.status != 200:
+                    logging.error(f"{ticker} : réponse HTTP {response.status}")
+                    return None
+                html = await response.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logging.error(f"{ticker} : erreur réseau {e!r}")
+            return None
+        price = parse_price(html)
+        if price is None:
+            logging.error(f"{ticker} : prix non extrait")
+        return price
+
+    async def scrape_once(self):
+        """Interroge tous les tickers en parallèle et enregistre les prix valides. Renvoie {ticker: prix}."""
+        prices = await asyncio.gather(*(self.fetch_price(ticker) for ticker in self.tickers))
+        timestamp = datetime.now(timezone.utc).isoformat()
+        results = {}
+        for ticker, price in zip(self.tickers, prices):
+            if price is not None and self.ingestor.add(ticker, timestamp, price):
+                results[ticker] = price
+        # Un seul lot par relevé : un fsync du journal pour tous les tickers
+        await asyncio.to_thread(self.ingestor.flush)
+        logging.info(f"{len(results)}/{len(self.tickers)} prix enregistrés à {timestamp}")
+        return results
+
+    async def write_snapshots(self):
+        # Processus à part : Dash et plotly ne sont pas chargés dans le scraper, et le relevé suivant n'attend pas
+        process = await asyncio.create_subprocess_exec(sys.executable, SNAPSHOT_SCRIPT, *self.tickers,
+                                                       stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE)
+        _, stderr = await process.communicate()
+        if process.returncode:
+            logging.error(f"Instantanés non écrits : {stderr.decode(errors='replace').strip()}")
+
+    async def run(self, interval, snapshot_every=SNAPSHOT_EVERY):
+        loop = asyncio.get_running_loop()
+        next_run = loop.time()
+        next_snapshot = loop.time()
+        snapshot_task = None
+        while True:
+            await self.scrape_once()
+            if snapshot_every and loop.time() >= next_snapshot and (snapshot_task is None or snapshot_task.done()):
+                snapshot_task = asyncio.create_task(self.write_snapshots())
+                next_snapshot = loop.time() + snapshot_every
+            # Cadence fixe : la durée du scraping est déduite de l'attente
+            next_run += interval
+            await asyncio.sleep(max(0.0, next_run - loop.time()))
+
+async def main(args):
+    async with Scraper(args.tickers, base_url=args.base_url, rate=args.rate, connections=args.connections) as scraper:
+        if args.once:
+            await scraper.scrape_once()
+        else:
+            await scraper.run(args.interval, args.snapshot_every)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Scraper Finviz asynchrone multi-tickers")
+    parser.add_argument('tickers', nargs='*', default=os.environ.get('SCRAPER_TICKERS', 'ANET').split(','))
+    parser.add_argument('--interval', type=float, default=60.0, help="secondes entre deux relevés")
+    parser.add_argument('--rate', type=float, default=2.0, help="requêtes par seconde maximum vers Finviz")
+    parser.add_argument('--connections', type=int, default=4, help="connexions persistantes maximum vers Finviz")
+    parser.add_argument('--base-url', default=FINVIZ_URL, help="URL de la page de cotation (serveur local pour les essais)")
+    parser.add_argument('--once', action='store_true', help="un seul relevé puis arrêt")
+    parser.add_argument('--snapshot-every', type=float, default=SNAPSHOT_EVERY,
+                        help="secondes entre deux instantanés de démarrage du tableau de bord (0 : aucun)")
+    args = parser.parse_args()
+    logging.basicConfig(filename=os.path.join(BASE_DIR, 'scraper.log'), level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    asyncio.run(main(args))
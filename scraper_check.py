@@ -0,0 +1,63 @@
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+
+from aiohttp import web
+
+# Vérification de scraper.py contre un faux serveur Finviz local : plusieurs relevés de tickers connus
+# et d'un ticker sans prix, écrits dans un stockage temporaire (le stockage du projet n'est pas touché).
+# python3 scraper_check.py   (code de sortie 1 en cas d'écart)
+PRICES = {'ANET': '95.12', 'MSFT': '1,234.50'}
+MISSING = 'BAD'
+ROUNDS = 2
+
+def quote_page(request):
+    # Même balise que la page de cotation Finviz ; un ticker inconnu renvoie une page sans prix
+    price = PRICES.get(request.query.get('t'))
+    if price is None:
+        return web.Response(text="<html><body>Ticker introuvable</body></html>", content_type='text/html')
+    return web.Response(text=f'<html><strong class="quote-price_wrapper_price">{price}</strong></html>', content_type='text/html')
+
+async def check():
+    """Renvoie la liste des écarts constatés (vide si tout est correct)."""
+    import price_store
+    from scraper import Scraper
+
+    server = web.Application()
+    server.router.add_get('/quote.ashx', quote_page)
+    runner = web.AppRunner(server)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', 0).start()
+    port = runner.addresses[0][1]
+    try:
+        async with Scraper(list(PRICES) + [MISSING], base_url=f"http://127.0.0.1:{port}/quote.ashx", rate=50) as scraper:
+            for _ in range(ROUNDS):
+                await scraper.scrape_once()
+    finally:
+        await runner.cleanup()
+
+    errors = []
+    for ticker, price in PRICES.items():
+        _, prices = price_store.read_series(price_store.recent_series(ticker))
+        expected = [float(price.replace(',', ''))] * ROUNDS
+        if list(prices) != expected:
+            errors.append(f"{ticker} : {list(prices)} au lieu de {expected}")
+    if price_store.exists(price_store.recent_series(MISSING)):
+        errors.append(f"{MISSING} : série écrite pour un ticker sans prix")
+    return errors
+
+if __name__ == '__main__':
+    store = tempfile.mkdtemp(prefix='scraper-check-')
+    # Avant l'import de price_store et ingest, qui lisent l'emplacement du stockage au chargement
+    os.environ['PRICE_STORE_DIR'] = store
+    try:
+        errors = asyncio.run(check())
+    finally:
+        shutil.rmtree(store, ignore_errors=True)
+    for error in errors:
+        print(f"Écart : {error}", file=sys.stderr)
+    if errors:
+        sys.exit(1)
+    print(f"Scraper vérifié : {ROUNDS} relevés de {', '.join(PRICES)} écrits, {MISSING} ignoré")
@@ -0,0 +1,169 @@
+import fcntl
+import json
+import logging
+import os
+import shutil
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+import price_store
+from market_calendar import NYSE
+
+# Série préparée par symbole (historique + récent, nettoyée et triée) partagée entre les workers gunicorn.
+# Un seul worker la met à jour à la fois (verrou flock) ; tous la lisent par memory-mapping,
+# les pages sont donc partagées par le cache du noyau au lieu d'être copiées dans chaque processus.
+PREPARED_DIR = os.path.join(price_store.STORE_DIR, '_prepared')
+
+def prepared_dir(symbol):
+    return os.path.join(PREPARED_DIR, symbol.upper())
+
+def meta_file(symbol):
+    return os.path.join(prepared_dir(symbol), 'meta.json')
+
+def generation_name(symbol, generation):
+    return os.path.join('_prepared', symbol.upper(), f"g{generation}")
+
+def jsonable(signature):
+    # Les signatures sont comparées sous leur forme JSON (listes)
+    return json.loads(json.dumps(signature))
+
+@contextmanager
+def refresh_lock(symbol=None):
+    # Verrou par symbole ; sans symbole, verrou global (migrations du stockage)
+    directory = PREPARED_DIR if symbol is None else prepared_dir(symbol)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, '.refresh.lock'), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def read_meta(symbol):
+    try:
+        with open(meta_file(symbol)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_meta(symbol, meta):
+    tmp_path = f"{meta_file(symbol)}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_file(symbol))
+
+def source_signatures(symbol):
+    return {kind: price_store.signature(price_store.series_name(symbol, kind)) for kind in price_store.KINDS}
+
+def uncovered_days(historical_times, recent_times):
+    # Clôtures quotidiennes (minuit UTC) des séances sans tick récent pendant la séance : une séance scrapée garde
+    # ses ticks, sans barre de minuit qui en deviendrait l'ouverture. Des ticks hors séance seuls (nuit, week-end)
+    # ne remplacent pas la clôture.
+    if not len(historical_times) or not len(recent_times):
+        return np.ones(len(historical_times), dtype=bool)
+    # Séances contenant au moins un tick (la série récente est triée : deux recherches par séance, pas une par tick)
+    covered = np.searchsorted(recent_times, NYSE.closes, side='right') > np.searchsorted(recent_times, NYSE.opens, side='left')
+    sessions = NYSE.session_ids(historical_times)
+    return (sessions < 0) | ~covered[np.maximum(sessions, 0)]
+
+def merge(historical, recent):
+    # Les séries sources sont validées à l'écriture (triées, prix > 0, voir price_store.clean_columns) :
+    # seule leur fusion reste à faire, en une passe (à horodatage égal, l'historique passe en premier).
+    # Les jours couverts par la série récente n'y prennent que ses ticks.
+    (historical_times, historical_prices), (recent_times, recent_prices) = historical, recent
+    keep = uncovered_days(historical_times, recent_times)
+    if not keep.all():
+        historical_times, historical_prices = historical_times[keep], historical_prices[keep]
+    if not len(historical_times) or not len(recent_times) or historical_times[-1] <= recent_times[0]:
+        return np.concatenate([historical_times, recent_times]), np.concatenate([historical_prices, recent_prices])
+    positions = np.searchsorted(historical_times, recent_times, side='right') + np.arange(len(recent_times))
+    from_recent = np.zeros(len(historical_times) + len(recent_times), dtype=bool)
+    from_recent[positions] = True
+    times_ns = np.empty(len(from_recent), dtype=price_store.TIME_DTYPE)
+    prices = np.empty(len(from_recent), dtype=price_store.PRICE_DTYPE)
+    times_ns[positions], prices[positions] = recent_times, recent_prices
+    times_ns[~from_recent], prices[~from_recent] = historical_times, historical_prices
+    return times_ns, prices
+
+def append_recent(symbol, meta, sources):
+    # Cas courant : la série récente a seulement grandi, on ajoute ses nouvelles lignes en fin de série
+    if meta is None or meta['sources']['historical'] != sources['historical']:
+        return None
+    recent = sources['recent']
+    previous = meta['sources']['recent']
+    if recent is None or previous is None or recent[0][0] != previous[0][0]:
+        return None
+    recent_name = price_store.recent_series(symbol)
+    if price_store.row_count(recent_name) < meta['recent_rows']:
+        return None
+    times_ns, prices = price_store.read_series(recent_name, start=meta['recent_rows'])
+    name = generation_name(symbol, meta['generation'])
+    if len(times_ns) and meta['rows']:
+        last_time, _ = price_store.read_series(name, start=meta['rows'] - 1, stop=meta['rows'])
+        if len(last_time) != 1 or times_ns[0] < last_time[0]:
+            return None
+        # Nouveaux ticks dans une séance qui a déjà sa clôture quotidienne : celle-ci doit être retirée
+        historical_last = price_store.last_time(price_store.historical_series(symbol))
+        if historical_last is not None:
+            last_session = NYSE.session_ids([historical_last])[0]
+            sessions = NYSE.session_ids(times_ns)
+            if last_session >= 0 and ((sessions >= 0) & (sessions <= last_session)).any():
+                return None
+    if len(times_ns):
+        price_store.append_series(name, times_ns, prices)
+    return dict(meta, rows=meta['rows'] + len(times_ns), recent_rows=meta['recent_rows'] + len(times_ns), sources=sources)
+
+def rebuild(symbol, meta, sources):
+    historical = price_store.read_series(price_store.historical_series(symbol))
+    recent = price_store.read_series(price_store.recent_series(symbol))
+    times_ns, prices = merge(historical, recent)
+    generation = (meta['generation'] if meta else 0) + 1
+    price_store.write_series(generation_name(symbol, generation), times_ns, prices)
+    return {'generation': generation, 'rows': len(times_ns), 'recent_rows': len(recent[0]), 'sources': sources}
+
+def remove_old_generations(symbol, generation):
+    # Les workers qui mappent encore une ancienne génération gardent leurs pages jusqu'au prochain rechargement
+    directory = prepared_dir(symbol)
+    for entry in os.listdir(directory):
+        if entry.startswith('g') and entry != f"g{generation}":
+            shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+def load_prepared(symbol, sources):
+    """Renvoie les métadonnées de la série préparée de `symbol` à jour pour `sources`, en la rafraîchissant si besoin."""
+    sources = jsonable(sources)
+    meta = read_meta(symbol)
+    if meta is not None and meta['sources'] == sources:
+        return meta
+    with refresh_lock(symbol):
+        # Un autre worker a pu faire le travail pendant l'attente du verrou
+        meta = read_meta(symbol)
+        if meta is not None and meta['sources'] == sources:
+            return meta
+        new_meta = append_recent(symbol, meta, sources)
+        if new_meta is None:
+            new_meta = rebuild(symbol, meta, sources)
+            logging.info(f"Série préparée {symbol} reconstruite : génération {new_meta['generation']}, {new_meta['rows']} lignes")
+        write_meta(symbol, new_meta)
+        if meta is None or new_meta['generation'] != meta['generation']:
+            remove_old_generations(symbol, new_meta['generation'])
+        return new_meta
+
+def map_prepared(symbol, sources):
+    """Renvoie (meta, times_ns, prices) de la série préparée de `symbol`, mappée en mémoire."""
+    for _ in range(3):
+        meta = load_prepared(symbol, sources)
+        times_ns, prices = price_store.read_series(generation_name(symbol, meta['generation']), stop=meta['rows'])
+        # La génération a pu être remplacée (et supprimée) entre la lecture des métadonnées et le mapping
+        if len(times_ns) == meta['rows']:
+            return meta, times_ns, prices
+    raise RuntimeError(f"Série préparée {symbol} introuvable après plusieurs tentatives")
+
+def to_frame(times_ns, prices, tz='Europe/Paris'):
+    # Enveloppe les tableaux mappés sans copie (l'heure de Paris n'est qu'une métadonnée du dtype)
+    times = pd.arrays.DatetimeArray._simple_new(np.asarray(times_ns).view('M8[ns]'), dtype=pd.DatetimeTZDtype(tz=tz))
+    return pd.DataFrame({'Time': pd.Series(times, copy=False), 'Price': pd.Series(prices, copy=False)}, copy=False)
+
+def empty_frame():
+    return to_frame(np.empty(0, dtype=price_store.TIME_DTYPE), np.empty(0, dtype=price_store.PRICE_DTYPE))
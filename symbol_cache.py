@@ -0,0 +1,159 @@
+import logging
+import threading
+from collections import OrderedDict
+
+import price_store
+import shared_cache
+import warm_snapshot
+from daily_aggregates import DailyAggregates
+from indicators import IndicatorEngine
+from ingest import SYMBOL_RE
+from rollups import Rollups
+from time_window import TimeWindows
+
+def data_version(symbol, generation, rows):
+    # Version des données envoyée au navigateur, puis comparée par le worker qui répond à la requête suivante :
+    # tirée des métadonnées de la série préparée, elle est la même dans tous les workers pour les mêmes données.
+    # Le symbole en fait partie, les caches de rendu étant communs à tous les symboles.
+    return f"{symbol}/{generation}/{rows}"
+
+class SymbolData:
+    """Données d'un symbole chargées en mémoire : série préparée mappée, agrégats journaliers, indicateurs, barres OHLC, bornes des plages."""
+
+    def __init__(self, symbol, on_update=None):
+        self.symbol = symbol
+        # Appelé avec (données, lignes et génération précédentes) à chaque nouvelle version
+        self.on_update = on_update
+        self.lock = threading.Lock()
+        self.frame = None
+        self.signatures = None
+        # (frame, version) est remplacé d'un bloc à chaque rechargement
+        self.state = (None, 0)
+        self.dirty = True
+        self.generation = None
+        self.rows = 0
+        self.daily_aggregates = DailyAggregates()
+        self.time_windows = TimeWindows()
+        self.indicators = IndicatorEngine()
+        self.rollups = Rollups()
+        # Instantané de démarrage relu au premier chargement (figures de la vue par défaut), None ensuite s'il n'y en a pas
+        self.snapshot = None
+
+    @classmethod
+    def unavailable(cls, symbol):
+        # Ticker absent du stockage : jamais chargé ni mis en cache, ses cartes restent vides
+        data = cls(symbol)
+        data.frame = shared_cache.empty_frame()
+        data.state = (data.frame, data_version(symbol, 0, 0))
+        return data
+
+    def paths(self):
+        return [path for kind in price_store.KINDS for path in price_store.column_paths(price_store.series_name(self.symbol, kind))]
+
+    def load(self, watched=False):
+        # Avec le watcher actif, aucun appel système tant qu'aucune écriture n'a été signalée
+        if self.frame is not None and watched and not self.dirty:
+            return self.frame
+
+        with self.lock:
+            self.dirty = False
+            signatures = shared_cache.source_signatures(self.symbol)
+            if self.frame is not None and signatures == self.signatures:
+                return self.frame
+
+            try:
+                meta, times_ns, prices = shared_cache.map_prepared(self.symbol, signatures)
+            except Exception as e:
+                logging.error(f"Erreur chargement des données {self.symbol} : {e}")
+                if self.frame is None:
+                    # Premier chargement en échec : cartes vides (comme un ticker sans données) plutôt qu'un état sans frame
+                    self.frame = shared_cache.empty_frame()
+                    self.state = (self.frame, data_version(self.symbol, 0, 0))
+                # Nouvel essai à la prochaine lecture, même sans écriture signalée par le watcher
+                self.dirty = True
+                return self.frame
+
+            if self.frame is not None and (meta['generation'], meta['rows']) == (self.generation, self.rows):
+                # Fichiers touchés sans nouvelle ligne (ex. colonne prix écrite après la colonne temps) : même version
+                self.signatures = signatures
+                return self.frame
+
+            # Les tableaux mappés sont enveloppés sans copie : recharger ne coûte que le mapping
+            combined = shared_cache.to_frame(times_ns, prices)
+            snapshot = warm_snapshot.read(self.symbol, meta) if self.generation is None else None
+            if snapshot is not None:
+                # Premier chargement avec un instantané à jour (ou presque) : seuls les ticks arrivés depuis sont traités
+                self.daily_aggregates.restore(snapshot.daily, combined.iloc[snapshot.rows:])
+                self.indicators.restore(combined, snapshot.rows, snapshot.indicators)
+                self.rollups.rebuild(combined)
+                self.snapshot = snapshot
+            elif self.generation is None or meta['generation'] != self.generation:
+                # Reconstruction complète, uniquement au premier chargement ou si une série a été réécrite
+                self.daily_aggregates.rebuild(combined)
+                self.indicators.rebuild(combined)
+                self.rollups.rebuild(combined)
+                self.snapshot = None
+            else:
+                # Cas courant : seules les nouvelles lignes de la série récente ont été ajoutées
+                self.daily_aggregates.update(combined.iloc[self.rows:])
+                # Indicateurs et barres OHLC déjà calculés : complétés avec les nouveaux ticks seulement
+                self.indicators.update(combined)
+                self.rollups.update(combined)
+            previous_rows, previous_generation = self.rows, self.generation
+            self.generation, self.rows = meta['generation'], meta['rows']
+
+            if combined.empty:
+                logging.warning(f"Aucune donnée valide pour {self.symbol}")
+
+            self.frame = combined
+            self.signatures = signatures
+            self.state = (combined, data_version(self.symbol, self.generation, self.rows))
+            if self.on_update is not None:
+                try:
+                    self.on_update(self, previous_rows, previous_generation)
+                except Exception as e:
+                    logging.error(f"Erreur de notification pour {self.symbol} : {e}")
+            return combined
+
+class SymbolCache:
+    """Symboles chargés à la demande, au plus `maxsize` en mémoire (le moins récemment consulté est libéré)."""
+
+    def __init__(self, maxsize=8, on_update=None):
+        self.maxsize = maxsize
+        self.on_update = on_update
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, symbol):
+        # Le symbole sert de nom de dossier : rien d'autre qu'un ticker ne doit atteindre le stockage
+        symbol = symbol.upper()
+        if not SYMBOL_RE.fullmatch(symbol):
+            raise ValueError(f"Symbole invalide : {symbol!r}")
+        with self.lock:
+            data = self.entries.get(symbol)
+            if data is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                data = self.entries[symbol] = SymbolData(symbol, self.on_update)
+                while len(self.entries) > self.maxsize:
+                    evicted, _ = self.entries.popitem(last=False)
+                    logging.info(f"Symbole {evicted} libéré du cache")
+            self.entries.move_to_end(symbol)
+            return data
+
+    def mark_dirty(self):
+        # Tous les symboles chargés revérifient leur signature à la prochaine lecture (après un fork)
+        with self.lock:
+            for data in self.entries.values():
+                data.dirty = True
+
+    def peek(self, symbol):
+        # Sans chargement ni mise à jour de l'ordre LRU (utilisé par le watcher)
+        with self.lock:
+            return self.entries.get(symbol.upper())
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,65 @@
+import threading
+
+import pandas as pd
+
+TIMEZONE = 'Europe/Paris'
+
+# Durées des plages du menu déroulant (les valeurs numériques sont des minutes)
+RANGE_DURATIONS = {
+    '5years': pd.Timedelta(days=5*365),
+    '3years': pd.Timedelta(days=3*365),
+    '1year': pd.Timedelta(days=365),
+    '6months': pd.Timedelta(days=180),
+    '3months': pd.Timedelta(days=90),
+    '1month': pd.Timedelta(days=30),
+    '1week': pd.Timedelta(days=7),
+}
+
+MAX_CACHED_BOUNDS = 256
+
+def window_start(time_range, now=None):
+    """Début de la plage `time_range` (None pour 'all'), arrondi à la minute."""
+    if time_range == 'all':
+        return None
+    if now is None:
+        now = pd.Timestamp.now(tz=TIMEZONE)
+    if time_range == 'ytd':
+        return pd.Timestamp(year=now.year, month=1, day=1).tz_localize(TIMEZONE)
+    if time_range in RANGE_DURATIONS:
+        cutoff = now - RANGE_DURATIONS[time_range]
+    else:
+        cutoff = now - pd.Timedelta(minutes=int(time_range))
+    return cutoff.floor('min')
+
+class TimeWindows:
+    """Découpe des plages de temps par recherche dichotomique sur la colonne Time triée.
+
+    Les bornes sont mémorisées par (plage, minute de début) tant que le DataFrame reste le même objet,
+    load_data() en créant un nouveau à chaque rechargement.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.frame = None
+        self.bounds = {}
+
+    def start_index(self, df, time_range, now=None):
+        cutoff = window_start(time_range, now)
+        if cutoff is None:
+            return 0
+        key = (time_range, cutoff)
+        with self.lock:
+            if df is not self.frame or len(self.bounds) >= MAX_CACHED_BOUNDS:
+                self.frame = df
+                self.bounds = {}
+            start = self.bounds.get(key)
+        if start is None:
+            start = int(df['Time'].searchsorted(cutoff, side='left'))
+            with self.lock:
+                if df is self.frame:
+                    self.bounds[key] = start
+        return start
+
+    def slice(self, df, time_range, now=None):
+        # Tranche positionnelle : pas de masque booléen sur tout l'historique
+        return df.iloc[self.start_index(df, time_range, now):]
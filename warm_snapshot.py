@@ -0,0 +1,168 @@
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import price_store
+import shared_cache
+from daily_aggregates import COLUMNS as DAILY_COLUMNS
+
+# Instantané de démarrage d'un ticker, écrit côté ingestion dans `store/_prepared/<TICKER>/snapshot/` :
+# table des séances, indicateurs de la vue par défaut (tableaux .npy memory-mappés comme la série préparée)
+# et figures de la vue par défaut, déjà sérialisées. Un worker qui démarre le relit au lieu de tout recalculer.
+SNAPSHOT_NAME = 'snapshot'
+
+# Largeurs de fenêtre (px) pour lesquelles la figure par défaut est précalculée
+WIDTHS = tuple(int(width) for width in os.environ.get('SNAPSHOT_WIDTHS', '1280,1440,1600,1920').split(','))
+
+# Un instantané en retard reste utilisable : les ticks arrivés depuis sont rejoués, jusqu'à cette limite
+MAX_REPLAY_ROWS = 100_000
+
+def snapshot_dir(symbol):
+    return os.path.join(shared_cache.prepared_dir(symbol), SNAPSHOT_NAME)
+
+def read_info(directory):
+    try:
+        with open(os.path.join(directory, 'meta.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+class Snapshot:
+    """Instantané relu : table des séances, indicateurs et figures de la vue par défaut, pour (génération, lignes)."""
+
+    def __init__(self, directory, info, daily, indicators):
+        self.directory = directory
+        self.info = info
+        self.generation = info['generation']
+        self.rows = info['rows']
+        self.daily = daily
+        self.indicators = indicators
+
+    def figure(self, time_range, sma_period, budget, start):
+        """Figure précalculée pour cette vue dont la fenêtre commence à la ligne `start`, ou None."""
+        for entry in self.info['figures']:
+            if (entry['time_range'], entry['sma_period'], entry['budget'], entry['start']) == (time_range, sma_period, budget, start):
+                try:
+                    with open(os.path.join(self.directory, entry['file'])) as f:
+                        return json.load(f)
+                except (OSError, ValueError):
+                    return None
+        return None
+
+def read(symbol, meta):
+    """Instantané de `symbol` utilisable pour la série préparée `meta` (même génération, un peu en retard au plus), ou None."""
+    directory = snapshot_dir(symbol)
+    info = read_info(directory)
+    if info is None or info['generation'] != meta['generation'] or not 0 <= meta['rows'] - info['rows'] <= MAX_REPLAY_ROWS:
+        return None
+    try:
+        columns = {column: np.load(os.path.join(directory, f"daily_{column}.npy")) for column in DAILY_COLUMNS}
+        index = pd.DatetimeIndex(np.load(os.path.join(directory, 'daily_index.npy')), name='Date')
+        daily = pd.DataFrame(columns, index=index)
+        indicators = []
+        for entry in info['indicators']:
+            arrays = {output: np.load(os.path.join(directory, f"{entry['kind']}_{entry['period']}_{output}.npy"), mmap_mode='r')
+                      for output in entry['outputs']}
+            if any(len(values) != info['rows'] for values in arrays.values()):
+                return None
+            indicators.append((entry['kind'], entry['period'], arrays, entry['state']))
+    except (OSError, ValueError) as e:
+        logging.warning(f"Instantané {symbol} illisible : {e}")
+        return None
+    # Remplacé pendant la lecture : les fichiers lus peuvent venir de deux instantanés différents
+    if read_info(directory) != info:
+        return None
+    return Snapshot(directory, info, daily, indicators)
+
+def write(symbol, generation, rows, daily, indicators, figures):
+    """Écrit l'instantané dans un dossier temporaire puis le met en place sous le verrou de la série préparée.
+
+    `indicators` : [(type, période, valeurs, état)] ; `figures` : [(vue, figure JSON)], la vue étant un dictionnaire
+    time_range, sma_period, budget, start (première ligne de la fenêtre).
+    """
+    directory = snapshot_dir(symbol)
+    tmp_dir = f"{directory}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    np.save(os.path.join(tmp_dir, 'daily_index.npy'), daily.index.to_numpy(dtype='datetime64[ns]'))
+    for column in DAILY_COLUMNS:
+        np.save(os.path.join(tmp_dir, f"daily_{column}.npy"), daily[column].to_numpy())
+    info = {'generation': generation, 'rows': rows, 'indicators': [], 'figures': []}
+    for kind, period, arrays, state in indicators:
+        for output, values in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{kind}_{period}_{output}.npy"), np.asarray(values, dtype='float64'))
+        info['indicators'].append({'kind': kind, 'period': period, 'outputs': list(arrays), 'state': state})
+    for i, (view, figure) in enumerate(figures):
+        with open(os.path.join(tmp_dir, f"figure_{i}.json"), 'w') as f:
+            f.write(figure)
+        info['figures'].append(dict(view, file=f"figure_{i}.json"))
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(info, f)
+
+    with shared_cache.refresh_lock(symbol):
+        old_dir = f"{directory}.old{os.getpid()}"
+        if os.path.exists(directory):
+            os.replace(directory, old_dir)
+        os.replace(tmp_dir, directory)
+        # Les workers qui mappent encore l'ancien instantané gardent leurs pages
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+def build(symbol, widths=WIDTHS):
+    """Calcule et écrit l'instantané de `symbol` avec le code du tableau de bord ; renvoie le nombre de lignes couvertes."""
+    # Dash et plotly ne sont chargés que par l'écrivain, pas par les processus d'ingestion qui n'écrivent pas d'instantané
+    import app
+    import plotly.io
+
+    time_range = app.app.layout['time-range-dropdown'].value
+    sma_period = app.app.layout['sma-period-dropdown'].value
+    for _ in range(3):
+        data = app.symbol_data(symbol)
+        df, _ = data.state
+        if df.empty:
+            return 0
+        figures = []
+        for width in widths:
+            figure, state = app.update_graph(None, symbol, time_range, sma_period, None, width, [], 'line', None)
+            start = 0 if state['cutoff'] is None else int(df['Time'].searchsorted(pd.Timestamp(state['cutoff']), side='left'))
+            figures.append(({'time_range': time_range, 'sma_period': sma_period, 'budget': state['budget'], 'start': start},
+                            plotly.io.json.to_json_plotly(figure)))
+        app.update_realtime(None, symbol)
+        # Un tick arrivé entre deux étapes : tout est recalculé sur la nouvelle version
+        if data.state[0] is df:
+            write(symbol, data.generation, len(df), data.daily_aggregates.table, data.indicators.saved(df), figures)
+            return len(df)
+    raise RuntimeError(f"Instantané {symbol} : les données changent trop vite")
+
+def is_fresh(symbol, max_age):
+    # Instantané écrit il y a moins de `max_age` secondes et toujours de la génération en cours
+    info = read_info(snapshot_dir(symbol))
+    meta = shared_cache.read_meta(symbol)
+    if info is None or meta is None or info['generation'] != meta['generation']:
+        return False
+    return time.time() - os.path.getmtime(os.path.join(snapshot_dir(symbol), 'meta.json')) < max_age
+
+if __name__ == '__main__':
+    # python3 warm_snapshot.py ANET AAPL                 (après le scraping ou un rattrapage de l'historique)
+    # python3 warm_snapshot.py ANET --max-age 900        (sans effet si l'instantané a moins de 15 minutes)
+    os.environ.setdefault('WATCH_FILES', '0')
+    parser = argparse.ArgumentParser(description="Instantané de démarrage du tableau de bord")
+    parser.add_argument('tickers', nargs='*', default=[price_store.DEFAULT_SYMBOL])
+    parser.add_argument('--max-age', type=float, default=0, help="secondes pendant lesquelles un instantané reste à jour")
+    args = parser.parse_args()
+    for ticker in args.tickers:
+        ticker = ticker.upper()
+        if args.max_age and is_fresh(ticker, args.max_age):
+            continue
+        try:
+            rows = build(ticker)
+        except Exception as e:
+            print(f"Erreur instantané {ticker} : {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Instantané {ticker} : {rows} lignes")